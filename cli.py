@@ -0,0 +1,79 @@
+"""Command line and run reports shared by main.py and dodge_game.py.
+
+Both games take the same options:
+
+    python main.py|dodge_game.py [--headless FRAMES] [--seed N] [--dirty-rects]
+                                 [--fps N] [--telemetry PATH] [--record PATH]
+                                 [--replay PATH]
+"""
+import argparse
+import os
+
+from replay import Replay, parse_seed
+
+
+def parse_args(description, argv=None, ignore_unknown=False):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--headless", type=int, metavar="FRAMES",
+                        help="simulate FRAMES frames without a display and report the speed")
+    parser.add_argument("--seed", type=parse_seed,
+                        help="random seed for the game (--headless runs default to 0, others pick one)")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="only redraw and update the parts of the screen that changed")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="frames drawn per second; the game itself always runs at 60 steps per second")
+    parser.add_argument("--telemetry", metavar="PATH",
+                        help="record one row per frame to PATH (.jsonl for JSON lines, otherwise CSV)")
+    parser.add_argument("--record", metavar="PATH", help="save this session's input to a replay file")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="re-simulate a recorded session without a display and report the outcome")
+    if ignore_unknown:
+        return parser.parse_known_args(argv)[0]
+    return parser.parse_args(argv)
+
+
+def runs_without_display(args):
+    """True for --headless runs and replays, which need no window or audio device"""
+    return args.headless is not None or args.replay is not None
+
+
+def use_dummy_drivers():
+    """Pick SDL's dummy video and audio drivers; call before pygame starts up"""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+
+def frame_budget(fps, timestep):
+    """Seconds a frame may take before telemetry flags it late.
+
+    --fps 0 runs uncapped, so that is judged by the simulation step instead.
+    """
+    return 1 / fps if fps > 0 else timestep.step
+
+
+def is_late(frame_phases, budget):
+    """Late: the frame took more than one and a half frame budgets"""
+    return sum(frame_phases.values()) > 1.5 * budget
+
+
+def report_headless(frames, elapsed, seed, pools=None):
+    """Print the simulation speed and, for a soak run, every pool's stats; pools maps names to PoolStats"""
+    fps = frames / elapsed if elapsed > 0 else float("inf")
+    print(f"Simulated {frames} frames in {elapsed:.3f}s ({fps:.0f} frames/s, seed {seed})")
+    for name, stats in (pools or {}).items():
+        print(f"  {name} pool: {stats.as_dict()}")
+    return fps
+
+
+def load_replay(path, game):
+    """Replay.load for --replay, exiting with a one-line message if the file can't be played"""
+    try:
+        return Replay.load(path, game)
+    except (OSError, ValueError) as error:
+        raise SystemExit(f"Can't play the replay: {error}")
+
+
+def report_replay(replay, elapsed, score, level):
+    speedup = replay.steps / 60 / elapsed if elapsed > 0 else float("inf")
+    print(f"Replayed {replay.steps} steps in {elapsed:.3f}s ({speedup:.0f}x real time, seed {replay.seed}): "
+          f"score {score}, level {level}")
@@ -0,0 +1,82 @@
+"""Per-level difficulty schedules, read from CSV tables in assets/difficulty.
+
+Each table has one row per level, in order:
+
+    level,score,speed,spawn_interval,wave,max_missiles
+    1,0,5.0,58,1,4
+    2,30,5.5,56,2,8
+
+score is the points needed to reach the level, speed the missiles' fall
+speed, spawn_interval the steps between waves, wave the missiles per wave
+and max_missiles how many may be in flight at once; a wave only tops the
+count back up to it. Retuning a game is an edit to its table.
+
+Levels keep coming past the last row, as they did before the tables: the
+score needed, speed and wave size keep growing at their average step over
+the table's last two levels (waves rounded down), while spawn_interval and
+max_missiles stay at the last row's, so the cap still bounds the missiles
+in flight however long a game lasts.
+"""
+import csv
+import os
+from collections import namedtuple
+
+TABLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "difficulty")
+
+Level = namedtuple("Level", ("level", "score", "speed", "spawn_interval", "wave", "max_missiles"))
+CONVERTERS = (int, int, float, int, int, int)
+
+
+class DifficultySchedule:
+    """The rows of a difficulty table, indexed by level.
+
+    Levels past the last row are extrapolated from the last two levels, as
+    the module docstring describes; a one-row table has no further levels.
+    """
+
+    def __init__(self, levels):
+        self.levels = tuple(levels)
+        if not self.levels:
+            raise ValueError("a difficulty table needs at least one level")
+        for number, row in enumerate(self.levels, 1):
+            if row.level != number:
+                raise ValueError(f"level {row.level} is listed where level {number} should be")
+            if number > 1 and row.score <= self.levels[number - 2].score:
+                raise ValueError(f"level {number} needs a higher score than level {number - 1}")
+            if row.spawn_interval < 1 or row.wave < 0 or row.max_missiles < 0:
+                raise ValueError(f"level {number} has a negative wave, cap or spawn interval")
+        self.max_level = len(self.levels)
+        self.max_missiles = max(row.max_missiles for row in self.levels)
+        # Levels the growth past the last row is measured over
+        self.span = min(2, self.max_level - 1)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, newline="") as file:
+            reader = csv.reader(file)
+            header = tuple(next(reader))
+            if header != Level._fields:
+                raise ValueError(f"{path} must have the columns {','.join(Level._fields)}")
+            return cls(Level(*(convert(value) for convert, value in zip(CONVERTERS, row)))
+                       for row in reader if row)
+
+    def __getitem__(self, level):
+        if level <= self.max_level:
+            return self.levels[level - 1]
+        last, base, span = self.levels[-1], self.levels[-1 - self.span], self.span
+        extra = level - self.max_level
+        return last._replace(level=level,
+                             score=last.score + extra * (last.score - base.score) // span,
+                             speed=last.speed + extra * (last.speed - base.speed) / span,
+                             wave=last.wave + extra * (last.wave - base.wave) // span)
+
+    def levelled_up(self, level, score):
+        """Whether score is enough to leave level"""
+        if level >= self.max_level and not self.span:
+            return False
+        return score >= self[level + 1].score
+
+
+def load_schedule(game):
+    """The table for one of replay.GAMES, e.g. "main" """
+    return DifficultySchedule.load(os.path.join(TABLES_DIR, game + ".csv"))
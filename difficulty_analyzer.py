@@ -0,0 +1,320 @@
+"""Play thousands of seeded games with a scripted bot and report how hard each level is.
+
+Games run headless in a process pool, as fast as the simulation allows.
+Each one is played until the bot is hit or max_steps runs out. The results
+go to out_dir:
+
+    games.csv     one row per game: survival time, score, level reached, peaks
+    survival.csv  share of games still alive at each time, per game kind
+    levels.csv    per level: games that reached it, deaths, death rate, time
+                  spent there, speed and wave size, and the most missiles,
+                  explosions and particles alive at once
+    summary.txt   the summary that is also printed
+
+Peak counts are the worst cases the renderer has to draw.
+
+    python difficulty_analyzer.py [--game main|dodge_game|both] [--games N]
+                                  [--bot dodge|idle] [--workers N] [--out DIR]
+    python difficulty_analyzer.py --check [--games N] ...
+
+--check plays the seeds with one worker and with several instead and
+exits with an error if any game turns out differently.
+"""
+import argparse
+import csv
+import multiprocessing
+import os
+import sys
+from collections import defaultdict
+
+# No window or audio device needed, and dodge_game opens its display on import
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+# SDL turns SIGTERM into a quit event by default, which would leave the pool unable to stop its workers
+os.environ["SDL_NO_SIGNAL_HANDLERS"] = "1"
+
+import numpy as np
+
+from replay import ReplayKeys
+
+LEFT, RIGHT = 1, 2
+GAMES = ("main", "dodge_game")
+GAMES_DIR = os.path.dirname(os.path.abspath(__file__))
+STEPS_PER_SECOND = 60
+SURVIVAL_BUCKET = 5  # Seconds between rows of survival.csv
+LOOKAHEAD = 60  # Steps ahead the dodging bot looks for incoming missiles
+
+
+def idle_bot(store, player, fall_speed, move_speed, width):
+    """Never touches the keys, like the headless benchmark"""
+    return 0
+
+
+def dodge_bot(store, player, fall_speed, move_speed, width):
+    """Slide left or right, whichever keeps the fewest missiles on course to hit.
+
+    Every live missile is projected to the step it reaches the player's
+    row, and each move is scored by how many of those would overlap the
+    player after holding it that long, sooner ones counting more. Ties go
+    to standing still, then to heading back towards the middle.
+    """
+    n = store.count
+    alive = store.alive[:n]
+    if not alive.any():
+        return 0
+    x = store.x[:n][alive]
+    y = store.y[:n][alive]
+    x_speed = store.x_speed[:n][alive]
+    fall = fall_speed[:n][alive] if np.ndim(fall_speed) else np.full(len(x), fall_speed)
+
+    # Steps until each missile's bottom edge reaches the player's top
+    arrival = np.maximum((player.top - (y + store.height)) / np.maximum(fall, 0.1), 0)
+    incoming = (arrival < LOOKAHEAD) & (y < player.bottom)
+    if not incoming.any():
+        return 0
+    arrival = arrival[incoming]
+    missile_x = x[incoming] + x_speed[incoming] * arrival
+    weight = 1 / (1 + arrival)
+
+    middle = (width - player.width) / 2
+    best = None
+    for mask, direction in ((0, 0), (LEFT, -1), (RIGHT, 1)):
+        player_x = np.clip(player.x + direction * move_speed * arrival, 0, width - player.width)
+        hit = (missile_x < player_x + player.width) & (missile_x + store.width > player_x)
+        danger = float(weight[hit].sum())
+        away = abs(player.x + direction * move_speed - middle)
+        rank = (danger, direction != 0, away)
+        if best is None or rank < best[0]:
+            best = (rank, mask)
+    return best[1]
+
+
+BOTS = {"dodge": dodge_bot, "idle": idle_bot}
+
+
+class Tracker:
+    """Time spent and peak entity counts at every level of one game"""
+
+    def __init__(self):
+        self.levels = []
+
+    def step(self, level, speed, wave, missiles, explosions, particles):
+        while len(self.levels) < level:
+            self.levels.append({"steps": 0, "speed": speed, "wave": wave,
+                                "missiles": 0, "explosions": 0, "particles": 0})
+        row = self.levels[level - 1]
+        row["steps"] += 1
+        row["missiles"] = max(row["missiles"], missiles)
+        row["explosions"] = max(row["explosions"], explosions)
+        row["particles"] = max(row["particles"], particles)
+
+
+def play_main(seed, bot, max_steps):
+    import main
+    game = main.Game(seed=seed)
+    game.start()
+    keys = ReplayKeys()
+    tracker = Tracker()
+    player = game.player
+    steps = 0
+    while not game.game_over and steps < max_steps:
+        keys.mask = bot(game.missiles, player.rect, game.missiles.speed, player.speed, main.WIDTH)
+        game.update(keys)
+        steps += 1
+        tracker.step(game.level, game.missile_speed, game.missiles_per_wave, len(game.missiles),
+                     len(game.explosions), game.particles.stats.in_use)
+    game.discard_sprites()
+    return steps, game.score, game.level, game.game_over, tracker
+
+
+def play_dodge(seed, bot, max_steps):
+    import dodge_game as dodge
+    dodge.seed_game(seed)
+    dodge.reset_game()
+    dodge.game_started = True
+    keys = ReplayKeys()
+    tracker = Tracker()
+    steps = 0
+    while not dodge.game_over and steps < max_steps:
+        keys.mask = bot(dodge.bullets, dodge.player, dodge.bullet_speed, dodge.player_speed, dodge.WIDTH)
+        dodge.update_game(keys)
+        steps += 1
+        tracker.step(dodge.level, dodge.bullet_speed, dodge.missiles_per_wave, len(dodge.bullets),
+                     len(dodge.explosions), 0)
+    return steps, dodge.score, dodge.level, dodge.game_over, tracker
+
+
+PLAYERS = {"main": play_main, "dodge_game": play_dodge}
+
+
+def init_worker():
+    # dodge_game loads its assets from relative paths on import, so run from beside the games
+    os.chdir(GAMES_DIR)
+    # dodge_game prints every level up; thousands of games would bury the summary
+    sys.stdout = open(os.devnull, "w")
+
+
+def play(task):
+    game, seed, bot, max_steps = task
+    steps, score, level, died, tracker = PLAYERS[game](seed, BOTS[bot], max_steps)
+    return {"game": game, "seed": seed, "steps": steps, "score": score, "level": level,
+            "died": died, "levels": tracker.levels}
+
+
+def run_games(games, count, seed=0, bot="dodge", max_steps=10 * 60 * STEPS_PER_SECOND, workers=None):
+    """Play count seeded games of every kind in games; results come back sorted by game and seed"""
+    tasks = [(game, game_seed, bot, max_steps) for game in games for game_seed in range(seed, seed + count)]
+    with multiprocessing.Pool(workers, initializer=init_worker) as pool:
+        results = list(pool.imap_unordered(play, tasks, chunksize=max(1, len(tasks) // 64)))
+        pool.close()
+        pool.join()
+    results.sort(key=lambda result: (GAMES.index(result["game"]), result["seed"]))
+    return results
+
+
+def peak(result, name):
+    return max((row[name] for row in result["levels"]), default=0)
+
+
+def game_row(result):
+    return (result["game"], result["seed"], round(result["steps"] / STEPS_PER_SECOND, 2),
+            result["steps"], result["score"], result["level"], int(result["died"]),
+            peak(result, "missiles"), peak(result, "explosions"), peak(result, "particles"))
+
+
+def write_games(path, results):
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(("game", "seed", "seconds", "steps", "score", "level", "died",
+                         "peak_missiles", "peak_explosions", "peak_particles"))
+        writer.writerows(game_row(result) for result in results)
+
+
+def check_reproducible(games, count=16, seed=0, bot="dodge", max_steps=10 * 60 * STEPS_PER_SECOND, workers=4):
+    """Play the same seeds in one worker and in several and fail if any games.csv row differs.
+
+    One worker plays every game back to back in the same process, so any
+    state a game leaves behind in its module shows up as a changed row.
+    """
+    serial = [game_row(result) for result in run_games(games, count, seed, bot, max_steps, 1)]
+    split = [game_row(result) for result in run_games(games, count, seed, bot, max_steps, workers)]
+    mismatches = [(one, many) for one, many in zip(serial, split) if one != many]
+    for one, many in mismatches:
+        print(f"{one[0]} seed {one[1]}: {one} with 1 worker, {many} with {workers}")
+    if mismatches:
+        raise SystemExit(f"{len(mismatches)} of {len(serial)} games depend on the worker count")
+    print(f"{len(serial)} games match between 1 worker and {workers}")
+
+
+def write_survival(path, results):
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(("game", "seconds", "alive", "fraction_alive"))
+        for game, group in group_by_game(results).items():
+            seconds = np.array([result["steps"] for result in group]) / STEPS_PER_SECOND
+            died = np.array([result["died"] for result in group])
+            for start in range(0, int(seconds.max()) + SURVIVAL_BUCKET, SURVIVAL_BUCKET):
+                # Games cut off by max_steps count as alive to the end
+                alive = int(np.count_nonzero((seconds > start) | ~died))
+                writer.writerow((game, start, alive, round(alive / len(group), 4)))
+
+
+def level_rows(group):
+    rows = []
+    deepest = max(len(result["levels"]) for result in group)
+    for level in range(1, deepest + 1):
+        reached = [result for result in group if len(result["levels"]) >= level]
+        stats = [result["levels"][level - 1] for result in reached]
+        deaths = sum(1 for result in reached if result["died"] and result["level"] == level)
+        rows.append({
+            "level": level,
+            "reached": len(reached),
+            "deaths": deaths,
+            "death_rate": deaths / len(reached),
+            "mean_seconds": sum(row["steps"] for row in stats) / len(stats) / STEPS_PER_SECOND,
+            "speed": stats[0]["speed"],
+            "wave": stats[0]["wave"],
+            "peak_missiles": max(row["missiles"] for row in stats),
+            "peak_explosions": max(row["explosions"] for row in stats),
+            "peak_particles": max(row["particles"] for row in stats),
+        })
+    return rows
+
+
+def write_levels(path, results):
+    columns = ("level", "reached", "deaths", "death_rate", "mean_seconds", "speed", "wave",
+               "peak_missiles", "peak_explosions", "peak_particles")
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(("game",) + columns)
+        for game, group in group_by_game(results).items():
+            for row in level_rows(group):
+                row["death_rate"] = round(row["death_rate"], 4)
+                row["mean_seconds"] = round(row["mean_seconds"], 2)
+                writer.writerow([game] + [row[column] for column in columns])
+
+
+def group_by_game(results):
+    groups = defaultdict(list)
+    for result in results:
+        groups[result["game"]].append(result)
+    return groups
+
+
+def summarize(results, bot):
+    lines = []
+    for game, group in group_by_game(results).items():
+        seconds = np.array([result["steps"] for result in group]) / STEPS_PER_SECOND
+        deaths = sum(result["died"] for result in group)
+        p10, median, p90 = np.percentile(seconds, (10, 50, 90))
+        rows = level_rows(group)
+        deadliest = max(rows, key=lambda row: (row["deaths"], row["level"]))
+        busiest = max(rows, key=lambda row: row["peak_missiles"])
+        lines += [
+            f"{game}: {len(group)} games with the {bot} bot, {deaths} ended by a hit",
+            f"  survival      p10 {p10:.1f}s, median {median:.1f}s, p90 {p90:.1f}s, longest {seconds.max():.1f}s",
+            f"  score         mean {np.mean([result['score'] for result in group]):.1f}, "
+            f"best {max(result['score'] for result in group)}",
+            f"  levels        reached up to {len(rows)}; most deaths at level {deadliest['level']} "
+            f"({deadliest['deaths']}, {deadliest['death_rate']:.0%} of those that got there)",
+            f"  peak entities {busiest['peak_missiles']} missiles (level {busiest['level']}), "
+            f"{max(row['peak_explosions'] for row in rows)} explosions, "
+            f"{max(row['peak_particles'] for row in rows)} particles",
+        ]
+    return "\n".join(lines)
+
+
+def main(games=GAMES, count=1000, seed=0, bot="dodge", max_steps=10 * 60 * STEPS_PER_SECOND,
+         workers=None, out_dir="difficulty"):
+    results = run_games(games, count, seed, bot, max_steps, workers)
+    os.makedirs(out_dir, exist_ok=True)
+    write_games(os.path.join(out_dir, "games.csv"), results)
+    write_survival(os.path.join(out_dir, "survival.csv"), results)
+    write_levels(os.path.join(out_dir, "levels.csv"), results)
+    summary = summarize(results, bot)
+    with open(os.path.join(out_dir, "summary.txt"), "w") as file:
+        file.write(summary + "\n")
+    print(summary)
+    print(f"CSVs written to {out_dir}/")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo difficulty analysis with a scripted bot")
+    parser.add_argument("--game", choices=GAMES + ("both",), default="both")
+    parser.add_argument("--games", type=int, default=1000, help="seeded games per game kind")
+    parser.add_argument("--seed", type=int, default=0, help="first seed; games use seed, seed+1, ...")
+    parser.add_argument("--bot", choices=sorted(BOTS), default="dodge")
+    parser.add_argument("--max-seconds", type=float, default=600,
+                        help="cut games off after this much game time")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--out", default="difficulty", help="directory for the CSVs and summary")
+    parser.add_argument("--check", action="store_true",
+                        help="check that every seed plays the same with 1 worker as with several, then exit")
+    args = parser.parse_args()
+    games = GAMES if args.game == "both" else (args.game,)
+    if args.check:
+        check_reproducible(games, args.games, args.seed, args.bot, int(args.max_seconds * STEPS_PER_SECOND),
+                           args.workers or 4)
+        sys.exit()
+    main(games, args.games, args.seed, args.bot, int(args.max_seconds * STEPS_PER_SECOND),
+         args.workers, args.out)
@@ -0,0 +1,48 @@
+import pygame
+
+
+class DirtyRectRenderer:
+    """Redraws and pushes only the parts of the screen that changed.
+
+    Each frame, restore() paints the background back over everything drawn
+    the frame before. The game then draws its objects and hands their rects
+    to present(), which sends both the old and the new rects to
+    pygame.display.update(). When those rects cover more than
+    max_dirty_fraction of the screen, a plain flip() is cheaper and is used
+    instead.
+    """
+
+    def __init__(self, screen, background, max_dirty_fraction=0.5):
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.max_dirty_area = self.screen_rect.width * self.screen_rect.height * max_dirty_fraction
+        self.set_background(background)
+
+    def set_background(self, background):
+        self.background = background
+        self.drawn = []
+        self.erased = []
+        self.full_redraw = True
+
+    def invalidate(self):
+        """Repaint and push the whole screen on the next frame"""
+        self.full_redraw = True
+
+    def restore(self):
+        if self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.drawn:
+                self.screen.blit(self.background, rect, rect)
+        self.erased = self.drawn
+        self.drawn = []
+
+    def present(self, rects):
+        self.drawn = [rect.clip(self.screen_rect) for rect in rects if rect]
+        dirty = self.erased + self.drawn
+        area = sum(rect.width * rect.height for rect in dirty)
+        if self.full_redraw or area > self.max_dirty_area:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+        self.full_redraw = False
@@ -4,6 +4,28 @@ import os
 import math
 from itertools import combinations
 import pygame.mixer
+import time
+from collections import defaultdict
+from sprites import SpriteCache
+from fonts import render_text, text_cache
+from dirty_rects import DirtyRectRenderer
+from missile_store import MissileStore, MissileView
+from timestep import FixedTimestep, lerp
+from pool import ObjectPool
+from entities import EntityList
+from profiler import FrameProfiler, SurfaceTally
+from telemetry import TelemetryRecorder, frame_columns, pool_values
+from rng import RandomStreams
+from replay import Replay, ReplayKeys, START, RESTART
+import cli
+from difficulty import load_schedule
+import numpy as np
+
+# Headless runs and replays use SDL's dummy drivers, so they need no window or audio device.
+# The display opens on import, so the command line is read before pygame starts up
+launch_args = cli.parse_args("Aircraft Dodge Game") if __name__ == "__main__" else None
+if launch_args is not None and cli.runs_without_display(launch_args):
+    cli.use_dummy_drivers()
 
 # Initialize Pygame
 pygame.init()
@@ -32,6 +54,7 @@ SOUND_VOLUME = 0.8  # Increased from 0.4 to 0.8 for louder effects
 # Add after other constants
 TITLE_FONT_SIZE = 128
 MENU_FONT_SIZE = 64
+HUD_FONT_SIZE = 48  # Increased font size
 GAME_TITLE = "Missile Invasion"
 game_started = False  # Add this with other game settings
 
@@ -124,6 +147,24 @@ player_x = WIDTH // 2 - player_width // 2
 player_y = HEIGHT - player_height - 40
 player_speed = 10
 player_base_y = player_y  # Store the base y position
+# Player position before the last step, for drawing between steps
+player_prev_x = player_x
+player_prev_y = player_y
+
+# Pre-rendered sprites, rebuilt automatically when the display mode changes
+sprite_cache = SpriteCache()
+# Planet looks rarely repeat, so only the most recent ones are kept
+planet_sprites = SpriteCache(limit=16)
+
+# Per-phase frame timings, shown with F3
+PHASES = ("events", "input", "update", "spawn", "collision", "draw background", "draw planets",
+          "draw player", "draw explosions", "draw missiles", "hud", "draw title", "profiler",
+          "flip", "tick wait")
+# Surfaces the title screen makes afresh every frame
+fresh_surfaces = SurfaceTally()
+profiler = FrameProfiler(PHASES, surface_counter=lambda: (sprite_cache.baked + planet_sprites.baked
+                                                          + text_cache.rendered
+                                                          + fresh_surfaces.created))
 
 # Load images
 player_img = load_image("aircraft.png", (player_width, player_height))
@@ -132,72 +173,110 @@ background_img = load_image("space_bg.png", (WIDTH, HEIGHT))
 # Bullet settings
 bullet_width = 20
 bullet_height = 40
-bullet_base_speed = 5  # Reduced from 11 to 5
-bullet_speed = bullet_base_speed
-bullets = []
 
 # Game settings
 clock = pygame.time.Clock()
 score = 0
 game_over = False
+# Bullet speed, spawn interval, wave size and missile cap for every level
+DIFFICULTY = load_schedule("dodge_game")
 level = 1
-missiles_per_wave = 1  # Initial number of missiles per spawn
-MISSILES_INCREASE_RATE = 1  # How many additional missiles per level
+bullet_speed = DIFFICULTY[1].speed
+spawn_interval = DIFFICULTY[1].spawn_interval
+missiles_per_wave = DIFFICULTY[1].wave  # Missiles per spawn
+max_missiles = DIFFICULTY[1].max_missiles  # Missiles allowed in flight at once
 EXPLOSION_DURATION = 60  # Number of frames to show explosion
 explosion_timer = 0
 show_game_over = False  # Separate from game_over flag
+# Separate random streams, so effects and scenery never shift gameplay
+rng = RandomStreams()
 
 # Star settings for background
-class Star:
-    def __init__(self):
-        self.x = random.randint(0, WIDTH)
-        self.y = random.randint(0, HEIGHT)
-        self.size = random.randint(1, 3)
-        self.brightness = random.random()
-        self.speed = random.random() * 0.1
+STAR_COUNT = 200
+TWINKLE_SLOTS = 255  # Palette entries shared by the stars, index 0 stays transparent
+
+class Starfield:
+    """Twinkling stars drawn once into an 8-bit surface.
+
+    Every star is painted with one of TWINKLE_SLOTS palette indices, and each
+    slot has its own brightness and twinkle speed. Twinkling only rewrites
+    the palette, and drawing copies just each star's few pixels out of the
+    8-bit surface rather than converting the whole screen every frame.
+    """
+    def __init__(self, count=STAR_COUNT):
+        stars = rng.stars
+        self.brightness = np.array([stars.random() for _ in range(TWINKLE_SLOTS)])
+        self.speed = np.array([stars.random() * 0.1 for _ in range(TWINKLE_SLOTS)])
+        
+        self.surface = pygame.Surface((WIDTH, HEIGHT), depth=8)
+        self.surface.set_colorkey(0)
+        # (source, dest, area) for every star, ready for Surface.blits()
+        self.blits = []
+        for _ in range(count):
+            x = stars.randint(0, WIDTH)
+            y = stars.randint(0, HEIGHT)
+            size = stars.randint(1, 3)
+            slot = stars.randint(1, TWINKLE_SLOTS)
+            rect = pygame.draw.circle(self.surface, slot, (x, y), size)
+            if rect.width and rect.height:
+                self.blits.append((self.surface, rect, rect))
 
     def update(self):
         self.brightness += self.speed
-        if self.brightness > 1:
-            self.brightness = 1
-            self.speed = -self.speed
-        elif self.brightness < 0.2:
-            self.brightness = 0.2
-            self.speed = -self.speed
+        # Bounce brightness between 0.2 and 1
+        too_bright = self.brightness > 1
+        too_dim = self.brightness < 0.2
+        self.brightness[too_bright] = 1
+        self.brightness[too_dim] = 0.2
+        self.speed[too_bright | too_dim] *= -1
         
     def draw(self, surface):
-        brightness = int(255 * self.brightness)
-        color = (brightness, brightness, brightness)
-        pygame.draw.circle(surface, color, (int(self.x), int(self.y)), self.size)
+        levels = (self.brightness * 255).astype(int).tolist()
+        self.surface.set_palette([(0, 0, 0)] + [(level, level, level) for level in levels])
+        surface.blits(self.blits, doreturn=False)
+
+# Create stars after game settings
+starfield = Starfield()
 
-# Create stars list after game settings
-stars = [Star() for _ in range(200)]  # Create 200 stars
+# Ring tilt is baked in steps of this many degrees
+PLANET_TILT_STEP = 0.5
 
-# Add after the Star class
+# Add after the Starfield class
 class Planet:
+    __slots__ = ("x", "y", "size", "speed", "color", "ring", "ring_color", "ring_angle",
+                 "tilt_step", "sprite_key")
+
     def __init__(self):
         self.reset()
         # Start planets at random positions along the height
-        self.y = random.randint(-200, 0)
+        self.y = rng.planets.randint(-200, 0)
         
     def reset(self):
-        self.x = random.randint(100, WIDTH - 100)  # Random x position
-        self.y = -random.randint(100, 300)  # Start above the screen
-        self.size = random.randint(40, 60)  # Made planets bigger
-        self.speed = random.uniform(0.2, 0.5)  # Even slower for bigger planets
+        planets_rng = rng.planets
+        self.x = planets_rng.randint(100, WIDTH - 100)  # Random x position
+        self.y = -planets_rng.randint(100, 300)  # Start above the screen
+        self.size = planets_rng.randint(40, 60)  # Made planets bigger
+        self.speed = planets_rng.uniform(0.2, 0.5)  # Even slower for bigger planets
         # Darker gray colors for background effect
-        gray_value = random.randint(60, 100)  # Darker gray
+        gray_value = planets_rng.randint(60, 100)  # Darker gray
         self.color = (gray_value, gray_value, gray_value)
         self.ring = True  # Always have rings
         self.ring_color = (min(gray_value + 10, 255),) * 3
-        self.ring_angle = random.uniform(-0.2, 0.2)  # Slight random tilt to rings
+        self.ring_angle = planets_rng.uniform(-0.2, 0.2)  # Slight random tilt to rings
+        
+        # Resets with the same size, gray and tilt step share a sprite. Bake it now
+        # rather than stall the first frame it is drawn, unless nothing is displayed
+        self.tilt_step = round(self.ring_angle * 30 / PLANET_TILT_STEP)
+        self.sprite_key = ("planet", self.size, gray_value, self.tilt_step)
+        if pygame.display.get_surface() is not None:
+            planet_sprites.get(self.sprite_key, self.bake)
         
     def update(self):
         self.y += self.speed  # Move downward
         if self.y > HEIGHT + self.size:  # Reset when planet goes below screen
             self.reset()
             
-    def draw(self, surface):
+    def bake(self):
         # Draw planet with slight transparency for background effect
         planet_surface = pygame.Surface((self.size * 5, self.size * 4), pygame.SRCALPHA)
         
@@ -220,126 +299,183 @@ class Planet:
             pygame.draw.ellipse(planet_surface, ring_color, ring_rect.inflate(-i * 10, -i * 2), 2)
         
         # Rotate the surface slightly for ring tilt effect
-        rotated_surface = pygame.transform.rotate(planet_surface, self.ring_angle * 30)
+        return pygame.transform.rotate(planet_surface, self.tilt_step * PLANET_TILT_STEP)
+        
+    def draw(self, surface):
+        rotated_surface = planet_sprites.get(self.sprite_key, self.bake)
         
         # Calculate new position after rotation
         new_rect = rotated_surface.get_rect(center=(int(self.x), int(self.y)))
-        surface.blit(rotated_surface, new_rect)
+        return surface.blit(rotated_surface, new_rect)
 
 # Keep just one planet
 planets = [Planet() for _ in range(1)]
 
-# Update bullet settings
-class Bullet:
-    def __init__(self, x):
-        self.x = x
-        self.y = -bullet_height
-        self.width = bullet_width
-        self.height = bullet_height
-        self.rect = pygame.Rect(x, -bullet_height, bullet_width, bullet_height)
-        self.flame_timer = 0
-        # Reduce initial horizontal movement
-        self.x_speed = random.uniform(-1, 1)  # Reduced from (-2, 2) to (-1, 1)
-        self.destroyed = False  # Add this flag
-        
-    def update(self):
-        self.y += bullet_speed
-        self.x += self.x_speed  # Add horizontal movement
-        # Keep missile within screen bounds
-        if self.x < 0 or self.x > WIDTH - self.width:
-            self.x_speed = -self.x_speed
-        self.rect.x = self.x
-        self.rect.y = self.y
-        self.flame_timer += 0.2
-        
-    def draw(self, surface):
-        # Colors for missile
-        ORANGE = (255, 140, 0)
-        GRAY = (128, 128, 128)
-        YELLOW = (255, 255, 0)
-        BRIGHT_YELLOW = (255, 255, 150)
-        
-        # Create surface for missile with transparency - Make much taller for longer flames
-        missile_surface = pygame.Surface((self.width, self.height * 4), pygame.SRCALPHA)
-        
-        # Draw missile body (gray parts) - Reversed order
-        body_height = self.height * 0.6
-        pygame.draw.rect(missile_surface, GRAY, 
-                        (0, self.height*0.4, self.width, body_height*0.4))
-        pygame.draw.rect(missile_surface, GRAY, 
-                        (0, self.height*0.2, self.width, body_height*0.4))
-        
-        # Draw missile nose (orange)
-        nose_points = [
-            (self.width/2, self.height),
-            (self.width, self.height*0.8),
-            (0, self.height*0.8)
-        ]
-        pygame.draw.polygon(missile_surface, ORANGE, nose_points)
-        
-        # Enhanced flame effect with much bigger animation
-        flame_height = self.height * 2.5  # Much longer flames
-        flame_offset = abs(math.sin(self.flame_timer)) * 12  # Increased flame movement
-        
-        # Draw multiple flame layers with wider spread
-        flame_colors = [
-            (BRIGHT_YELLOW + (255,)),    # Inner bright yellow flame
-            (YELLOW + (220,)),           # Middle yellow flame
-            (ORANGE + (180,)),           # Outer orange flame
-            ((255, 50, 0, 150)),         # Red outer glow
-            ((255, 30, 0, 100)),         # Extra outer glow
-            ((255, 20, 0, 80))           # Final outer glow
+# Missile flame animation, baked once instead of redrawn for every missile
+FLAME_FRAMES = 16  # Steps across one flicker cycle of the flame
+FLAME_VARIANTS = 4  # Particle patterns cycled frame to frame
+
+# Missile colours: nose, body, flame, flame core
+MISSILE_PALETTE = (
+    (255, 140, 0),
+    (128, 128, 128),
+    (255, 255, 0),
+    (255, 255, 150),
+)
+
+def render_missile(surface, width, height, flame_offset, rng):
+    # Colors for missile
+    ORANGE, GRAY, YELLOW, BRIGHT_YELLOW = MISSILE_PALETTE
+    
+    # Draw missile body (gray parts) - Reversed order
+    body_height = height * 0.6
+    pygame.draw.rect(surface, GRAY, 
+                    (0, height*0.4, width, body_height*0.4))
+    pygame.draw.rect(surface, GRAY, 
+                    (0, height*0.2, width, body_height*0.4))
+    
+    # Draw missile nose (orange)
+    nose_points = [
+        (width/2, height),
+        (width, height*0.8),
+        (0, height*0.8)
+    ]
+    pygame.draw.polygon(surface, ORANGE, nose_points)
+    
+    # Enhanced flame effect with much bigger animation
+    flame_height = height * 2.5  # Much longer flames
+    
+    # Draw multiple flame layers with wider spread
+    flame_colors = [
+        (BRIGHT_YELLOW + (255,)),    # Inner bright yellow flame
+        (YELLOW + (220,)),           # Middle yellow flame
+        (ORANGE + (180,)),           # Outer orange flame
+        ((255, 50, 0, 150)),         # Red outer glow
+        ((255, 30, 0, 100)),         # Extra outer glow
+        ((255, 20, 0, 80))           # Final outer glow
+    ]
+    
+    for i, color in enumerate(flame_colors):
+        spread = i * 6  # Increased spread between flame layers
+        flame_points = [
+            (width/2, 0 - flame_offset + i*12),         # Top point (flame tip)
+            (0 - spread, height*0.2 + spread*0.8),      # Left point (wider)
+            (width + spread, height*0.2 + spread*0.8)  # Right point (wider)
         ]
+        pygame.draw.polygon(surface, color, flame_points)
         
-        for i, color in enumerate(flame_colors):
-            spread = i * 6  # Increased spread between flame layers
-            flame_points = [
-                (self.width/2, 0 - flame_offset + i*12),         # Top point (flame tip)
-                (0 - spread, self.height*0.2 + spread*0.8),      # Left point (wider)
-                (self.width + spread, self.height*0.2 + spread*0.8)  # Right point (wider)
+        # Add extra flame details
+        if i < 4:  # More inner flames
+            # Add flickering inner flames
+            inner_flame_points = [
+                (width/2, flame_height*0.15 - flame_offset + i*8),
+                (width/2 - 6 + i, height*0.1),
+                (width/2 + 6 - i, height*0.1)
             ]
-            pygame.draw.polygon(missile_surface, color, flame_points)
-            
-            # Add extra flame details
-            if i < 4:  # More inner flames
-                # Add flickering inner flames
-                inner_flame_points = [
-                    (self.width/2, flame_height*0.15 - flame_offset + i*8),
-                    (self.width/2 - 6 + i, self.height*0.1),
-                    (self.width/2 + 6 - i, self.height*0.1)
-                ]
-                pygame.draw.polygon(missile_surface, BRIGHT_YELLOW + (200,), inner_flame_points)
-        
-        # Add more flame particles with longer trail
-        for _ in range(8):  # More particles
-            particle_x = self.width/2 + random.uniform(-10, 10)  # Wider spread
-            particle_y = random.uniform(-flame_height*0.6, flame_height*0.3)  # Longer range
-            particle_size = random.uniform(2, 5)  # Bigger particles
-            pygame.draw.circle(missile_surface, BRIGHT_YELLOW + (150,),
-                             (particle_x, particle_y), particle_size)
-        
+            pygame.draw.polygon(surface, BRIGHT_YELLOW + (200,), inner_flame_points)
+    
+    # Add more flame particles with longer trail
+    for _ in range(8):  # More particles
+        particle_x = width/2 + rng.uniform(-10, 10)  # Wider spread
+        particle_y = rng.uniform(-flame_height*0.6, flame_height*0.3)  # Longer range
+        particle_size = rng.uniform(2, 5)  # Bigger particles
+        pygame.draw.circle(surface, BRIGHT_YELLOW + (150,),
+                         (particle_x, particle_y), particle_size)
+
+def bake_missile(phase, variant):
+    # Sample the flicker in the middle of this phase step
+    flame_offset = abs(math.sin((phase + 0.5) * math.pi / FLAME_FRAMES)) * 12
+    # Make surface much taller for longer flames
+    sprite = pygame.Surface((bullet_width, bullet_height * 4), pygame.SRCALPHA)
+    render_missile(sprite, bullet_width, bullet_height, flame_offset, random.Random(variant))
+    return sprite
+
+def missile_sprite(phase, variant):
+    return sprite_cache.get(("missile", phase, variant), lambda: bake_missile(phase, variant))
+
+def missile_frame(flame_timer):
+    # abs(sin) repeats every pi, so the phase wraps there
+    phase = int(flame_timer % math.pi / math.pi * FLAME_FRAMES) % FLAME_FRAMES
+    # flame_timer moves 0.2 per frame, so this picks a new particle pattern every frame
+    variant = int(flame_timer * 5 + 0.5) % FLAME_VARIANTS
+    return missile_sprite(phase, variant)
+
+def bake_missile_frames():
+    for phase in range(FLAME_FRAMES):
+        for variant in range(FLAME_VARIANTS):
+            missile_sprite(phase, variant)
+
+# Update bullet settings
+class Bullet(MissileView):
+    __slots__ = ()
+
+    def draw(self, surface):
         # Adjust position for longer flames
-        surface.blit(missile_surface, (self.x, self.y - self.height*1.5))
+        return surface.blit(missile_frame(self.flame_timer), (self.draw_x, self.draw_y - self.height*1.5))
 
     def check_collision(self, other):
         # Check if two missiles collide
         return (not self.destroyed and not other.destroyed and 
                 self.rect.colliderect(other.rect))
 
+# Broad phase for missile-missile collisions
+class SpatialHash:
+    def __init__(self, cell_width, cell_height):
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.cells = {}
+
+    def rebuild(self, bullets):
+        self.cells.clear()
+        lefts, tops = bullets.rect_positions()
+        # Every cell the rect covers, so overlapping rects always share one
+        first_cx = (lefts // self.cell_width).tolist()
+        last_cx = ((lefts + bullets.width - 1) // self.cell_width).tolist()
+        first_cy = (tops // self.cell_height).tolist()
+        last_cy = ((tops + bullets.height - 1) // self.cell_height).tolist()
+        for index in np.flatnonzero(bullets.alive[:bullets.count]).tolist():
+            for cx in range(first_cx[index], last_cx[index] + 1):
+                for cy in range(first_cy[index], last_cy[index] + 1):
+                    self.cells.setdefault((cx, cy), []).append(index)
+
+    def candidate_pairs(self, bullets):
+        """Index pairs that might collide, in the same order combinations() yields them"""
+        self.rebuild(bullets)
+        pairs = set()
+        for cell in self.cells.values():
+            if len(cell) > 1:
+                pairs.update(combinations(cell, 2))
+        return sorted(pairs)
+
+# Grid cells match the missile rect, so each missile lands in at most 4 cells
+bullet_grid = SpatialHash(bullet_width, bullet_height)
+
+# Every missile in flight, stored as arrays and seen through Bullet views
+bullets = MissileStore(Bullet, bullet_width, bullet_height)
+
+# Bake the whole flame animation up front
+bake_missile_frames()
+
 # Update spawn_bullet function
 def spawn_bullet():
-    x = random.randint(0, WIDTH - bullet_width)
-    bullets.append(Bullet(x))
+    x = rng.spawn.randint(0, WIDTH - bullet_width)
+    # Reduce initial horizontal movement
+    return bullets.spawn(x, -bullet_height, x_speed=rng.spawn.uniform(-1, 1))  # Reduced from (-2, 2) to (-1, 1)
+
+# Player colours: body, outline, shadow, rotor hub, emblem, hub highlight, details
+AIRCRAFT_PALETTE = (
+    (100, 255, 0),
+    (50, 180, 0),
+    (30, 130, 0),
+    (255, 255, 0),
+    (255, 50, 50),
+    (255, 255, 255),
+    (80, 80, 80),
+)
 
 def draw_aircraft(surface, x, y, width, height):
     # Enhanced color palette
-    GREEN = (100, 255, 0)
-    DARK_GREEN = (50, 180, 0)
-    DARKER_GREEN = (30, 130, 0)
-    YELLOW = (255, 255, 0)
-    RED = (255, 50, 50)
-    WHITE = (255, 255, 255)
-    GRAY = (80, 80, 80)
+    GREEN, DARK_GREEN, DARKER_GREEN, YELLOW, RED, WHITE, GRAY = AIRCRAFT_PALETTE
     
     # Main body - center section
     body_width = width * 0.6
@@ -428,26 +564,60 @@ def draw_aircraft(surface, x, y, width, height):
     pygame.draw.line(surface, WHITE, 
                     (cross_x + shield_width*0.5, cross_y), 
                     (cross_x, cross_y + shield_height*0.5), 2)
+    
+    # Area drawn to: the rotors stick out past the sides and the shadow hangs below
+    return pygame.Rect(x - rotor_radius, y, width + rotor_radius * 2, height + 6)
+
+def render_explosion(radius, max_radius, fade):
+    # One pixel of slack on each side so the outer circle is never clipped
+    size = radius * 2 + 2
+    center = radius + 1
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    
+    # Calculate alpha for the entire explosion
+    alpha = max(0, min(255, fade))
+    
+    # Draw multiple circles for explosion effect
+    for r in range(int(radius), max(0, int(radius - 20)), -2):
+        if r > 0:
+            # Calculate color with fade
+            if max_radius > 60:  # Aircraft explosion
+                red = 255
+                green = min(255, int(100 + r * 3 * (fade/255)))
+                blue = 0
+            else:  # Regular explosion
+                red = 255
+                green = min(255, int(80 + r * 2 * (fade/255)))
+                blue = 0
+            
+            # Apply fade to alpha
+            current_alpha = int(alpha * (1 - (r / max_radius)))
+            color = (red, green, blue, current_alpha)
+            
+            pygame.draw.circle(surface, color, (center, center), r)
+    return surface
 
 # Add explosion effect class
+# Explosion kinds: start radius, max radius, growth rate, fade rate
+EXPLOSION_KINDS = {
+    False: (8, 60, 2, 8),
+    # Special explosion for aircraft
+    True: (15, 150, 3, 5),
+}
+
 class Explosion:
+    __slots__ = ("x", "y", "delay", "radius", "max_radius", "growth_rate", "fade", "fade_rate")
+
     def __init__(self, x, y, is_player=False, is_aircraft=False, delay=0):
+        self.reset(x, y, is_player, is_aircraft, delay)
+
+    def reset(self, x, y, is_player=False, is_aircraft=False, delay=0):
+        """Set up a fresh explosion in place, so pooled ones can be reused"""
         self.x = x
         self.y = y
         self.delay = delay
-        # Special explosion for aircraft
-        if is_aircraft:
-            self.radius = 15
-            self.max_radius = 150
-            self.growth_rate = 3
-            self.fade = 255
-            self.fade_rate = 5  # Increased fade rate
-        else:
-            self.radius = 8
-            self.max_radius = 60
-            self.growth_rate = 2
-            self.fade = 255
-            self.fade_rate = 8  # Increased fade rate
+        self.radius, self.max_radius, self.growth_rate, self.fade_rate = EXPLOSION_KINDS[is_aircraft]
+        self.fade = 255
         
     def update(self):
         if self.delay > 0:
@@ -464,57 +634,66 @@ class Explosion:
         # Return False when completely faded
         return self.fade > 0
         
+    def sprite(self):
+        # Every explosion of a kind goes through the same (radius, fade) steps
+        radius, max_radius, fade = self.radius, self.max_radius, self.fade
+        return sprite_cache.get(("explosion", max_radius, radius, fade),
+                                lambda: render_explosion(radius, max_radius, fade))
+        
     def draw(self, surface):
         if self.fade <= 0:  # Don't draw if completely faded
             return
-            
-        # Calculate alpha for the entire explosion
-        alpha = max(0, min(255, self.fade))
-        
-        # Draw multiple circles for explosion effect
-        for r in range(int(self.radius), max(0, int(self.radius - 20)), -2):
-            if r > 0:
-                # Calculate color with fade
-                if self.max_radius > 60:  # Aircraft explosion
-                    red = 255
-                    green = min(255, int(100 + r * 3 * (self.fade/255)))
-                    blue = 0
-                else:  # Regular explosion
-                    red = 255
-                    green = min(255, int(80 + r * 2 * (self.fade/255)))
-                    blue = 0
-                
-                # Apply fade to alpha
-                current_alpha = int(alpha * (1 - (r / self.max_radius)))
-                color = (red, green, blue, current_alpha)
-                
-                pygame.draw.circle(surface, color, 
-                                (int(self.x), int(self.y)), r)
+        
+        # Blend the pre-rendered frame so the fade actually shows
+        return surface.blit(self.sprite(), (int(self.x) - self.radius - 1, int(self.y) - self.radius - 1))
+
+def bake_explosion_frames():
+    for is_aircraft in (False, True):
+        explosion = Explosion(0, 0, is_aircraft=is_aircraft)
+        while explosion.fade > 0:
+            explosion.sprite()
+            explosion.update()
+
+# Bake every explosion frame up front
+bake_explosion_frames()
 
 # Add explosions list to game settings
-explosions = []
+explosions = EntityList()
+# Explosions are reused instead of allocated on every collision
+explosion_pool = ObjectPool(Explosion, 64)
 
-def draw_start_screen(surface):
+def bake_title_background():
     # Create gradient background
+    background = pygame.Surface((WIDTH, HEIGHT))
     for i in range(HEIGHT):
         color = (0, 0, max(0, min(40 + i * 0.02, 60)))  # Darker to lighter blue
-        pygame.draw.line(surface, color, (0, i), (WIDTH, i))
-    
-    # Draw stars in background
-    for star in stars:
-        star.update()
-        star.draw(surface)
-    
-    # Draw title
-    title_font = pygame.font.Font(None, TITLE_FONT_SIZE)
-    menu_font = pygame.font.Font(None, MENU_FONT_SIZE)
-    
-    # Draw game title with glow effect
-    title_text = title_font.render(GAME_TITLE, True, (255, 255, 0))  # Yellow text
-    title_glow = title_font.render(GAME_TITLE, True, (255, 128, 0))  # Orange glow
+        pygame.draw.line(background, color, (0, i), (WIDTH, i))
+    return background
+
+def title_layout():
+    # Game title with glow effect
+    title_text = render_text(TITLE_FONT_SIZE, GAME_TITLE, (255, 255, 0))  # Yellow text
+    title_glow = render_text(TITLE_FONT_SIZE, GAME_TITLE, (255, 128, 0))  # Orange glow
+    # Controls info
+    controls_text = render_text(MENU_FONT_SIZE, "Arrow keys to move", (200, 200, 200))
     
     title_rect = title_text.get_rect(center=(WIDTH//2, HEIGHT//3))
     glow_rect = title_glow.get_rect(center=(WIDTH//2 + 2, HEIGHT//3 + 2))
+    controls_rect = controls_text.get_rect(center=(WIDTH//2, HEIGHT*4//5))
+    # The text cache keeps these surfaces; each is blitted on its own so antialiased
+    # edges blend straight onto the screen
+    layout = [(title_glow, glow_rect), (title_text, title_rect), (controls_text, controls_rect)]
+    return layout, title_rect
+
+def draw_start_screen(surface):
+    # Gradient background, rendered once
+    surface.blit(sprite_cache.get("title_background", bake_title_background, alpha=False), (0, 0))
+    
+    # Draw stars in background
+    starfield.update()
+    starfield.draw(surface)
+    
+    title_lines, title_rect = title_layout()
     
     # Draw decorative missiles on sides of title
     missile_width = 40
@@ -523,13 +702,10 @@ def draw_start_screen(surface):
     
     def draw_decorative_missile(x, y, flip=False):
         # Colors for missile (match game missile colors)
-        ORANGE = (255, 140, 0)
-        GRAY = (128, 128, 128)
-        YELLOW = (255, 255, 0)
-        BRIGHT_YELLOW = (255, 255, 150)
+        ORANGE, GRAY, YELLOW, BRIGHT_YELLOW = MISSILE_PALETTE
         
         # Create missile surface with transparency
-        missile = pygame.Surface((missile_width, missile_height * 3), pygame.SRCALPHA)
+        missile = fresh_surfaces(pygame.Surface((missile_width, missile_height * 3), pygame.SRCALPHA))
         
         # Draw missile body (gray parts)
         body_height = missile_height * 0.6
@@ -581,15 +757,15 @@ def draw_start_screen(surface):
         
         # Add flame particles
         for _ in range(6):
-            particle_x = missile_width/2 + random.uniform(-10, 10)
-            particle_y = random.uniform(-flame_height*0.6, flame_height*0.3)
-            particle_size = random.uniform(2, 4)
+            particle_x = missile_width/2 + rng.title.uniform(-10, 10)
+            particle_y = rng.title.uniform(-flame_height*0.6, flame_height*0.3)
+            particle_size = rng.title.uniform(2, 4)
             pygame.draw.circle(missile, BRIGHT_YELLOW + (150,),
                              (particle_x, particle_y), particle_size)
         
         # Rotate missile if needed
         if flip:
-            missile = pygame.transform.rotate(missile, 180)
+            missile = fresh_surfaces(pygame.transform.rotate(missile, 180))
         
         # Add pulsing effect
         pulse = (math.sin(pygame.time.get_ticks() * 0.005) + 1) * 0.5
@@ -606,36 +782,364 @@ def draw_start_screen(surface):
     draw_decorative_missile(left_missile_x, missile_y)
     draw_decorative_missile(right_missile_x, missile_y, flip=True)
     
-    # Draw title over missiles
-    surface.blit(title_glow, glow_rect)
-    surface.blit(title_text, title_rect)
+    # Draw title and controls info over missiles
+    surface.blits(title_lines)
     
     # Draw "Press SPACE to start" with pulsing effect
     pulse = (math.sin(pygame.time.get_ticks() * 0.005) + 1) * 0.5  # Pulsing value between 0 and 1
     alpha = int(255 * pulse)
     
-    start_text = menu_font.render("Press SPACE to start", True, (255, 255, 255))
-    start_surface = pygame.Surface(start_text.get_size(), pygame.SRCALPHA)
+    # Copy the cached text, the fade below draws onto it
+    start_text = fresh_surfaces(render_text(MENU_FONT_SIZE, "Press SPACE to start", (255, 255, 255)).copy())
+    start_surface = fresh_surfaces(pygame.Surface(start_text.get_size(), pygame.SRCALPHA))
     start_surface.fill((255, 255, 255, alpha))
     start_text.blit(start_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
     
     start_rect = start_text.get_rect(center=(WIDTH//2, HEIGHT*2//3))
     surface.blit(start_text, start_rect)
+
+# Player rect and spawn counter used by the game loop
+player = pygame.Rect(player_x, player_y, player_width, player_height)
+bullet_timer = 0
+
+# Key state with nothing held down, for runs without a keyboard
+NO_KEYS = defaultdict(bool)
+
+def set_level(new_level):
+    global level, bullet_speed, spawn_interval, missiles_per_wave, max_missiles
+    settings = DIFFICULTY[new_level]
+    level = new_level
+    bullet_speed = settings.speed
+    spawn_interval = settings.spawn_interval
+    missiles_per_wave = settings.wave
+    max_missiles = settings.max_missiles
+
+def reset_game():
+    global player_x, player_y, player_prev_x, player_prev_y, score, game_over, explosion_timer, show_game_over, game_started, bullet_timer
+    game_over = False
+    show_game_over = False
+    game_started = False  # Return to start screen
+    explosion_timer = 0
+    bullet_timer = 0  # Every game starts a full spawn interval from its first wave
+    score = 0
+    set_level(1)
+    bullets.clear()
+    explosion_pool.release_all(explosions.clear())
+    player_x = WIDTH // 2 - player_width // 2
+    player_y = player_base_y
+    # No step may run before the next frame, so draw the aircraft from here rather than where it died
+    player_prev_x, player_prev_y = player_x, player_y
+    player.x, player.y = player_x, player_y
+
+def update_game(keys):
+    """Advance the game by one fixed step without drawing anything"""
+    global player_x, player_y, player_prev_x, player_prev_y, score, game_over, explosion_timer, show_game_over, bullet_timer
     
-    # Draw controls info
-    controls_text = menu_font.render("Arrow keys to move", True, (200, 200, 200))
-    controls_rect = controls_text.get_rect(center=(WIDTH//2, HEIGHT*4//5))
-    surface.blit(controls_text, controls_rect)
+    # Move player
+    player_prev_x, player_prev_y = player_x, player_y
+    if keys[pygame.K_LEFT] and player_x > 0:
+        player_x -= player_speed
+    if keys[pygame.K_RIGHT] and player_x < WIDTH - player_width:
+        player_x += player_speed
+    # Add forward/backward movement
+    if keys[pygame.K_UP] and player_y > 100:  # Limit how high the aircraft can go
+        player_y -= player_speed
+    if keys[pygame.K_DOWN] and player_y < HEIGHT - player_height - 20:
+        player_y += player_speed
+    
+    # Update player position
+    player.x = player_x
+    player.y = player_y  # Update y position
+    profiler.mark("update")
+    
+    # Level up at the scores in the difficulty table
+    if DIFFICULTY.levelled_up(level, score):
+        set_level(level + 1)
+        play_sound(level_up_sound)  # Play level up sound
+        print(f"Level {level}! Speed: {bullet_speed:.1f}, Missiles: {missiles_per_wave}")
+    
+    # Spawn multiple bullets with spacing
+    bullet_timer += 1
+    if bullet_timer >= spawn_interval:
+        # Spawn missiles with some spacing between them, never more in flight than the level allows
+        for i in range(min(missiles_per_wave, max_missiles - len(bullets))):
+            spawn_bullet()
+            try:
+                missile_sound.play()
+            except:
+                pass
+        bullet_timer = 0
+    profiler.mark("spawn")
+    
+    # Check missile collisions
+    for i, j in bullet_grid.candidate_pairs(bullets):
+        b1, b2 = bullets[i], bullets[j]
+        if b1.check_collision(b2):
+            # Create explosion at collision point
+            explosion_x = (b1.x + b2.x) / 2
+            explosion_y = (b1.y + b2.y) / 2
+            explosions.add(explosion_pool.acquire(explosion_x, explosion_y))
+            b1.destroyed = True
+            b2.destroyed = True
+            play_sound(explosion_sound)  # Play explosion sound
+    
+    # Remove destroyed missiles
+    bullets.compact()
+    profiler.mark("collision")
+    
+    # Update explosions; finished ones are dropped at the end of the step
+    for handle, exp in explosions.items():
+        if not exp.update():
+            explosions.remove(handle)
+    
+    # Update remaining bullets in one pass, bouncing off the side walls
+    bullets.update(bullet_speed, bounce_width=WIDTH)
+    profiler.mark("update")
+    off_screen = bullets.below(HEIGHT)
+    hits = np.flatnonzero(bullets.colliding(player))
+    
+    # Only count score if game is not over
+    if not game_over:
+        # A hit ends the game, so later missiles in the wave no longer score
+        scoring = off_screen if len(hits) == 0 else off_screen[:hits[0]]
+        score += int(np.count_nonzero(scoring))
+    bullets.kill(off_screen)  # Still remove bullets that go off screen
+    
+    # Update player collision to create explosion
+    effects = rng.effects
+    for index in hits.tolist():
+        bullet = bullets[index]
+        # Create chain reaction explosions
+        explosion_points = [
+            # Center explosions
+            (player.x + player_width/2, player.y + player_height/2, 0),
+            # Rotor explosions
+            (player.x + player_width*0.2, player.y + player_height*0.5, 5),
+            (player.x + player_width*0.8, player.y + player_height*0.5, 5),
+            # Wing explosions
+            (player.x + player_width*0.3, player.y + player_height*0.3, 10),
+            (player.x + player_width*0.7, player.y + player_height*0.3, 10),
+            # Body explosions
+            (player.x + player_width*0.4, player.y + player_height*0.6, 15),
+            (player.x + player_width*0.6, player.y + player_height*0.6, 15),
+            # Final explosions
+            (player.x + player_width*0.5, player.y, 20),
+            (player.x + player_width*0.5, player.y + player_height, 20),
+            # Additional random explosions
+            (player.x + effects.uniform(0, player_width), 
+             player.y + effects.uniform(0, player_height), 25),
+            (player.x + effects.uniform(0, player_width), 
+             player.y + effects.uniform(0, player_height), 30),
+        ]
+        
+        # Create delayed chain reaction explosions
+        for ex_x, ex_y, delay in explosion_points:
+            if effects.random() < 0.7:  # 70% chance for each explosion
+                explosions.add(explosion_pool.acquire(ex_x, ex_y, is_aircraft=True, delay=delay))
+        
+        # Create missile explosion
+        explosions.add(explosion_pool.acquire(bullet.x + bullet_width/2,
+                                              bullet.y + bullet_height/2))
+        
+        bullet.destroyed = True
+        game_over = True
+        explosion_timer = EXPLOSION_DURATION + 40  # Longer duration for chain reaction
+        play_sound(explosion_sound)  # Play explosion sound
+    profiler.mark("collision")
+    
+    # Handle explosion timer
+    if game_over and explosion_timer > 0:
+        explosion_timer -= 1
+        if explosion_timer <= 0:
+            show_game_over = True
+    
+    # Update stars
+    starfield.update()
+        
+    # Update planets
+    for planet in planets:
+        planet.update()
+
+    # Drop the explosions that finished this step
+    explosion_pool.release_all(explosions.flush())
+    profiler.mark("update")
+
+def draw_game(surface, clear=True, blend=1.0):
+    """Draw the frame and return the rects that were drawn to.
+
+    With clear=False the background is left alone, for the dirty-rect
+    renderer that restores it itself. The player and the missiles are drawn
+    blend of the way from their previous step to the current one.
+    """
+    rects = []
+    
+    if clear:
+        surface.fill(BACKGROUND_COLOR)  # Use the defined background color
+        
+        # Draw stars
+        starfield.draw(surface)
+    profiler.mark("draw background")
+        
+    # Draw planets
+    for planet in planets:
+        rects.append(planet.draw(surface))
+    profiler.mark("draw planets")
+    
+    # Draw player (aircraft) only if not game over
+    if not game_over:
+        rects.append(draw_aircraft(surface, lerp(player_prev_x, player.x, blend),
+                                   lerp(player_prev_y, player.y, blend), player_width, player_height))
+    profiler.mark("draw player")
+    
+    # Draw explosions
+    for explosion in explosions:
+        rects.append(explosion.draw(surface))
+    profiler.mark("draw explosions")
+    
+    # Draw remaining bullets
+    bullets.blend = blend
+    for bullet in bullets:
+        rects.append(bullet.draw(surface))
+    profiler.mark("draw missiles")
+    
+    # Draw score, only rendered again when a value changes
+    score_text = render_text(HUD_FONT_SIZE, f"Score: {score}", WHITE)
+    rects.append(surface.blit(score_text, (20, 20)))
+    
+    # Level
+    level_text = render_text(HUD_FONT_SIZE, f"Level: {level}", WHITE)
+    rects.append(surface.blit(level_text, (20, 70)))
+    
+    # Speed
+    speed_text = render_text(HUD_FONT_SIZE, f"Speed: {bullet_speed:.1f}", WHITE)
+    rects.append(surface.blit(speed_text, (20, 120)))
+    
+    # Missiles per wave
+    missile_text = render_text(HUD_FONT_SIZE, f"Missiles: {missiles_per_wave}", WHITE)
+    rects.append(surface.blit(missile_text, (20, 170)))
+    
+    # Draw game over screen only after explosion finishes
+    if show_game_over:
+        game_over_text = render_text(HUD_FONT_SIZE, "Game Over! Press R to restart", WHITE)
+        text_rect = game_over_text.get_rect(center=(WIDTH//2, HEIGHT//2))
+        rects.append(surface.blit(game_over_text, text_rect))
+    profiler.mark("hud")
+    return rects
+
+def bake_game_background():
+    # Stars are part of the background here, so they hold still in dirty-rect mode
+    background = pygame.Surface((WIDTH, HEIGHT))
+    background.fill(BACKGROUND_COLOR)
+    starfield.draw(background)
+    return background
+
+# Pools whose high-water marks and misses go into telemetry
+POOLS = ("missiles", "explosions")
+
+def pool_stats():
+    """PoolStats of the missile store and the explosion pool, keyed by the names in POOLS"""
+    return {"missiles": bullets.stats, "explosions": explosion_pool.stats}
+
+def open_telemetry(path):
+    counts = [("missiles", "i4"), ("explosions", "i4"), ("level", "i4"), ("bullet_speed", "f8"),
+              ("missiles_per_wave", "i4")]
+    return TelemetryRecorder(path, frame_columns(counts, PHASES, POOLS))
+
+def record_frame(telemetry, steps=1, late=False, backlog_dropped=False):
+    telemetry.record(profiler.frame_phases, steps=steps, missiles=len(bullets),
+                     explosions=len(explosions), level=level, bullet_speed=bullet_speed,
+                     missiles_per_wave=missiles_per_wave, late=late,
+                     backlog_dropped=backlog_dropped, **pool_values(pool_stats()))
+
+def seed_game(seed=None):
+    """Restart every random stream from seed and lay out the scenery again"""
+    global starfield
+    rng.reseed(seed)
+    starfield = Starfield()
+    planets[:] = [Planet() for _ in range(1)]
+
+def run_headless(frames, seed=0, telemetry_path=None):
+    """Step the game logic as fast as possible and report simulated frames per second.
+
+    Never draws or flips, so it measures pure game logic. Start the script
+    with --headless so SDL's dummy drivers are picked before pygame starts
+    up. Nobody is at the keyboard, so the player sits still and the game
+    restarts after every game over.
+    """
+    global game_started
+    seed_game(seed)
+    reset_game()
+    game_started = True
+    
+    telemetry = open_telemetry(telemetry_path) if telemetry_path else None
+    profiler.start()
+    start = time.perf_counter()
+    for _ in range(frames):
+        update_game(NO_KEYS)
+        if show_game_over:
+            reset_game()
+            game_started = True
+        if telemetry is not None:
+            profiler.end_frame()
+            record_frame(telemetry)
+    elapsed = time.perf_counter() - start
+    if telemetry is not None:
+        telemetry.close()
+    
+    return cli.report_headless(frames, elapsed, seed, pool_stats())
+
+def play_replay(path):
+    """Re-simulate a recorded session as fast as possible, without drawing"""
+    global game_started
+    replay = cli.load_replay(path, "dodge_game")
+    seed_game(replay.seed)
+    reset_game()
+    
+    keys = ReplayKeys()
+    start = time.perf_counter()
+    for step, mask in enumerate(replay.masks()):
+        try:
+            if mask & RESTART:
+                reset_game()
+            if mask & START:
+                game_started = True
+            keys.mask = mask
+            update_game(keys)
+        except Exception:
+            print(f"Replay failed at step {step}")
+            raise
+    elapsed = time.perf_counter() - start
+    
+    cli.report_replay(replay, elapsed, score, level)
 
 # Update main function
-def main():
-    global player_x, player_y, score, game_over, bullet_speed, level, missiles_per_wave, explosion_timer, show_game_over, game_started
+def main(headless_frames=None, seed=None, dirty_rects=False, fps=60, telemetry_path=None,
+         record_path=None, replay_path=None):
+    global game_started
+    
+    if replay_path is not None:
+        play_replay(replay_path)
+        pygame.quit()
+        return
+    if headless_frames is not None:
+        run_headless(headless_frames, seed or 0, telemetry_path)
+        pygame.quit()
+        return
+    
+    seed_game(seed)
+    # Input for every step, to play the session back later
+    replay = Replay("dodge_game", rng.seed) if record_path else None
     
-    player = pygame.Rect(player_x, player_y, player_width, player_height)
-    bullet_timer = 0
-    last_speed_increase = 0
+    # Opt-in: only repaint and push the parts of the screen that changed
+    renderer = DirtyRectRenderer(window, bake_game_background()) if dirty_rects else None
+    # The game always steps at 60 Hz, whatever fps frames are drawn at
+    timestep = FixedTimestep(60)
+    frame_budget = cli.frame_budget(fps, timestep)
+    telemetry = open_telemetry(telemetry_path) if telemetry_path else None
     
     running = True
+    # Setup above isn't part of the first frame
+    profiler.start()
     while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -645,6 +1149,8 @@ def main():
             if not game_started:
                 if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
                     game_started = True
+                    if replay is not None:
+                        replay.action(START)
                     play_music()  # Start music when game starts
                     continue
             
@@ -652,183 +1158,49 @@ def main():
             if event.type == pygame.KEYDOWN and show_game_over:
                 if event.key == pygame.K_r:
                     # Reset game
-                    game_over = False
-                    show_game_over = False
-                    game_started = False  # Return to start screen
-                    explosion_timer = 0
-                    score = 0
-                    level = 1
-                    missiles_per_wave = 1
-                    bullet_speed = bullet_base_speed
-                    bullets.clear()
-                    explosions.clear()
-                    player_x = WIDTH // 2 - player_width // 2
-                    player_y = player_base_y
+                    reset_game()
+                    if replay is not None:
+                        replay.action(RESTART)
+            
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle()
+        profiler.mark("events")
         
         # Draw start screen if game hasn't started
         if not game_started:
             draw_start_screen(window)
+            profiler.mark("draw title")
+            profiler.draw(window)
+            profiler.mark("profiler")
             pygame.display.flip()
-            clock.tick(60)
+            profiler.mark("flip")
+            if renderer is not None:
+                renderer.invalidate()  # The title screen covered everything
+            timestep.reset()  # Don't try to catch up on time spent here
+            clock.tick(fps)
+            profiler.mark("tick wait")
+            profiler.end_frame()
+            if telemetry is not None:
+                record_frame(telemetry, steps=0)
             continue
-            
-        # Move player
+        
         keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT] and player_x > 0:
-            player_x -= player_speed
-        if keys[pygame.K_RIGHT] and player_x < WIDTH - player_width:
-            player_x += player_speed
-        # Add forward/backward movement
-        if keys[pygame.K_UP] and player_y > 100:  # Limit how high the aircraft can go
-            player_y -= player_speed
-        if keys[pygame.K_DOWN] and player_y < HEIGHT - player_height - 20:
-            player_y += player_speed
-        
-        # Update player position
-        player.x = player_x
-        player.y = player_y  # Update y position
-        
-        # Level and speed increase
-        if score > 0 and score % 30 == 0 and score != last_speed_increase:
-            bullet_speed += 0.5
-            level += 1
-            missiles_per_wave += MISSILES_INCREASE_RATE
-            last_speed_increase = score
-            play_sound(level_up_sound)  # Play level up sound
-            print(f"Level {level}! Speed: {bullet_speed:.1f}, Missiles: {missiles_per_wave}")
-        
-        # Spawn multiple bullets with spacing
-        bullet_timer += 1
-        if bullet_timer >= 30:  # Spawn bullet every 30 frames
-            # Spawn missiles with some spacing between them
-            for i in range(missiles_per_wave):
-                x = random.randint(0, WIDTH - bullet_width)
-                bullets.append(Bullet(x))
-                try:
-                    missile_sound.play()
-                except:
-                    pass
-            bullet_timer = 0
-        
-        # Check missile collisions
-        for b1, b2 in combinations(bullets, 2):
-            if b1.check_collision(b2):
-                # Create explosion at collision point
-                explosion_x = (b1.x + b2.x) / 2
-                explosion_y = (b1.y + b2.y) / 2
-                explosions.append(Explosion(explosion_x, explosion_y))
-                b1.destroyed = True
-                b2.destroyed = True
-                play_sound(explosion_sound)  # Play explosion sound
-        
-        # Remove destroyed missiles
-        bullets[:] = [b for b in bullets if not b.destroyed]
-        
-        # Update and remove finished explosions
-        explosions[:] = [exp for exp in explosions if exp.update()]
-        
-        # Update remaining bullets
-        for bullet in bullets[:]:
-            bullet.update()
-            # Only count score if game is not over
-            if bullet.y > HEIGHT and not game_over:
-                bullets.remove(bullet)
-                score += 1
-            elif bullet.y > HEIGHT:
-                bullets.remove(bullet)  # Still remove bullets that go off screen
-            
-            # Update player collision to create explosion
-            if bullet.rect.colliderect(player):
-                # Create chain reaction explosions
-                explosion_points = [
-                    # Center explosions
-                    (player.x + player_width/2, player.y + player_height/2, 0),
-                    # Rotor explosions
-                    (player.x + player_width*0.2, player.y + player_height*0.5, 5),
-                    (player.x + player_width*0.8, player.y + player_height*0.5, 5),
-                    # Wing explosions
-                    (player.x + player_width*0.3, player.y + player_height*0.3, 10),
-                    (player.x + player_width*0.7, player.y + player_height*0.3, 10),
-                    # Body explosions
-                    (player.x + player_width*0.4, player.y + player_height*0.6, 15),
-                    (player.x + player_width*0.6, player.y + player_height*0.6, 15),
-                    # Final explosions
-                    (player.x + player_width*0.5, player.y, 20),
-                    (player.x + player_width*0.5, player.y + player_height, 20),
-                    # Additional random explosions
-                    (player.x + random.uniform(0, player_width), 
-                     player.y + random.uniform(0, player_height), 25),
-                    (player.x + random.uniform(0, player_width), 
-                     player.y + random.uniform(0, player_height), 30),
-                ]
-                
-                # Create delayed chain reaction explosions
-                for ex_x, ex_y, delay in explosion_points:
-                    if random.random() < 0.7:  # 70% chance for each explosion
-                        explosions.append(Explosion(ex_x, ex_y, is_aircraft=True, delay=delay))
-                
-                # Create missile explosion
-                explosions.append(Explosion(bullet.x + bullet_width/2, 
-                                         bullet.y + bullet_height/2))
-                
-                bullet.destroyed = True
-                game_over = True
-                explosion_timer = EXPLOSION_DURATION + 40  # Longer duration for chain reaction
-                play_sound(explosion_sound)  # Play explosion sound
-        
-        # Handle explosion timer
-        if game_over and explosion_timer > 0:
-            explosion_timer -= 1
-            if explosion_timer <= 0:
-                show_game_over = True
+        profiler.mark("input")
+        steps = timestep.advance()
+        for _ in range(steps):
+            if replay is not None:
+                replay.record(keys)
+            update_game(keys)
         
         # Draw everything
-        window.fill(BACKGROUND_COLOR)  # Use the defined background color
-        
-        # Update and draw stars
-        for star in stars:
-            star.update()
-            star.draw(window)
-            
-        # Update and draw planets
-        for planet in planets:
-            planet.update()
-            planet.draw(window)
-        
-        # Draw player (aircraft) only if not game over
-        if not game_over:
-            draw_aircraft(window, player.x, player.y, player_width, player_height)
-        
-        # Draw explosions
-        for explosion in explosions:
-            explosion.draw(window)
-        
-        # Draw remaining bullets
-        for bullet in bullets:
-            bullet.draw(window)
-        
-        # Draw score
-        font = pygame.font.Font(None, 48)  # Increased font size
-        score_text = font.render(f"Score: {score}", True, WHITE)
-        window.blit(score_text, (20, 20))
-        
-        # Level
-        level_text = font.render(f"Level: {level}", True, WHITE)
-        window.blit(level_text, (20, 70))
-        
-        # Speed
-        speed_text = font.render(f"Speed: {bullet_speed:.1f}", True, WHITE)
-        window.blit(speed_text, (20, 120))
-        
-        # Missiles per wave
-        missile_text = font.render(f"Missiles: {missiles_per_wave}", True, WHITE)
-        window.blit(missile_text, (20, 170))
-        
-        # Draw game over screen only after explosion finishes
-        if show_game_over:
-            game_over_text = font.render("Game Over! Press R to restart", True, WHITE)
-            text_rect = game_over_text.get_rect(center=(WIDTH//2, HEIGHT//2))
-            window.blit(game_over_text, text_rect)
+        if renderer is None:
+            draw_game(window, blend=timestep.blend)
+            profiler.draw(window)
+        else:
+            renderer.restore()
+            rects = draw_game(window, clear=False, blend=timestep.blend)
+            rects.append(profiler.draw(window))
+        profiler.mark("profiler")
         
         # Stop music when game over
         if game_over and not show_game_over:
@@ -837,10 +1209,25 @@ def main():
             except:
                 pass
         
-        pygame.display.flip()
-        clock.tick(60)  # 60 FPS
+        if renderer is None:
+            pygame.display.flip()
+        else:
+            renderer.present(rects)
+        profiler.mark("flip")
+        clock.tick(fps)
+        profiler.mark("tick wait")
+        profiler.end_frame(missiles=len(bullets), explosions=len(explosions))
+        if telemetry is not None:
+            late = cli.is_late(profiler.frame_phases, frame_budget)
+            record_frame(telemetry, steps, late, timestep.dropped)
+
+    if telemetry is not None:
+        telemetry.close()
+    if replay is not None:
+        replay.save(record_path)
 
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
+    args = launch_args
+    main(args.headless, args.seed, args.dirty_rects, args.fps, args.telemetry, args.record, args.replay)
@@ -0,0 +1,76 @@
+class EntityList:
+    """Unordered entity container with stable handles and O(1) removal.
+
+    add() returns a handle that keeps pointing at the same entity until it
+    is removed, however the others move around. remove() only marks the
+    entity; flush() at the end of the tick swaps each marked entity with
+    the last one and pops it, so nothing is ever shifted or copied.
+    Iterating while removing is safe: marked entities are skipped, and
+    entities added during a loop are not visited by it.
+    """
+
+    def __init__(self):
+        self.entities = []
+        self.handles = []
+        self.positions = {}
+        self.pending = set()
+        self.next_handle = 0
+
+    def add(self, entity):
+        handle = self.next_handle
+        self.next_handle += 1
+        self.positions[handle] = len(self.entities)
+        self.entities.append(entity)
+        self.handles.append(handle)
+        return handle
+
+    def get(self, handle):
+        position = self.positions.get(handle)
+        if position is None or handle in self.pending:
+            return None
+        return self.entities[position]
+
+    def remove(self, handle):
+        """Mark an entity for removal at the next flush()"""
+        if handle in self.positions:
+            self.pending.add(handle)
+
+    def flush(self):
+        """Drop every marked entity and return them, e.g. to release to a pool"""
+        removed = []
+        entities, handles, positions = self.entities, self.handles, self.positions
+        for handle in self.pending:
+            position = positions.pop(handle)
+            removed.append(entities[position])
+            last_entity = entities.pop()
+            last_handle = handles.pop()
+            if last_handle != handle:
+                entities[position] = last_entity
+                handles[position] = last_handle
+                positions[last_handle] = position
+        self.pending.clear()
+        return removed
+
+    def clear(self):
+        """Drop every entity at once and return them"""
+        removed = self.entities
+        self.entities = []
+        self.handles = []
+        self.positions.clear()
+        self.pending.clear()
+        return removed
+
+    def items(self):
+        """(handle, entity) for every live entity"""
+        entities, handles, pending = self.entities, self.handles, self.pending
+        for position in range(len(entities)):
+            handle = handles[position]
+            if handle not in pending:
+                yield handle, entities[position]
+
+    def __iter__(self):
+        for _, entity in self.items():
+            yield entity
+
+    def __len__(self):
+        return len(self.entities) - len(self.pending)
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class FontRegistry:
+    """Loads each (face, size) font once and hands out the same Font after that"""
+
+    def __init__(self):
+        self.fonts = {}
+
+    def get(self, size, face=None):
+        key = (face, size)
+        font = self.fonts.get(key)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = pygame.font.Font(face, size)
+            self.fonts[key] = font
+        return font
+
+
+class TextCache:
+    """Rendered text surfaces, keyed by (font, text, color, antialias).
+
+    Text is only rendered again when the string changes, so HUD lines cost
+    a dict lookup while their values stay the same. The least recently used
+    entries are dropped once the cache is full. Callers must not draw onto
+    the returned surfaces; copy() them first.
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        # Running total of text surfaces rendered, for the profiler
+        self.rendered = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = font.render(text, antialias, color)
+        self.rendered += 1
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+    def __len__(self):
+        return len(self.surfaces)
+
+
+font_registry = FontRegistry()
+text_cache = TextCache()
+
+
+def get_font(size, face=None):
+    return font_registry.get(size, face)
+
+
+def render_text(size, text, color, antialias=True, face=None):
+    """Render text with the shared font registry and text cache"""
+    return text_cache.render(font_registry.get(size, face), text, color, antialias)
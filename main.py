@@ -3,174 +3,238 @@ import random
 import math
 import asyncio
 import platform
+import time
+from collections import defaultdict
+from sprites import SpriteCache
+from fonts import render_text, text_cache
+from particles import ParticleEngine, bake_circle
+from dirty_rects import DirtyRectRenderer
+from missile_store import MissileStore, MissileView
+from timestep import FixedTimestep, lerp
+from pool import ObjectPool
+from entities import EntityList
+from profiler import FrameProfiler
+from telemetry import TelemetryRecorder, frame_columns, pool_values
+from rng import RandomStreams
+from replay import Replay, ReplayKeys, START, RESTART
+import cli
+from difficulty import load_schedule
+import numpy as np
+
+# Player colours: body, outline, shadow, rotor hub, hub highlight
+AIRCRAFT_PALETTE = (
+    (100, 255, 0),
+    (50, 180, 0),
+    (30, 130, 0),
+    (255, 255, 0),
+    (255, 255, 255),
+)
+
+# Missile colours: nose, body, flame
+MISSILE_PALETTE = (
+    (255, 140, 0),
+    (128, 128, 128),
+    (255, 255, 0),
+)
+
+# Pre-rendered sprites, rebuilt automatically when the display mode changes
+sprite_cache = SpriteCache()
+
+# Per-phase frame timings, shown with F3
+PHASES = ("events", "input", "update", "spawn", "collision", "draw background", "draw planets",
+          "draw explosions", "draw objects", "hud", "profiler", "flip", "tick wait")
+profiler = FrameProfiler(PHASES, surface_counter=lambda: sprite_cache.baked + text_cache.rendered)
+
+# Missile speed, spawn interval, wave size and missile cap for every level
+DIFFICULTY = load_schedule("main")
+
+def render_aircraft(surface, x, y, width, height, palette):
+    GREEN, DARK_GREEN, DARKER_GREEN, YELLOW, WHITE = palette
+    
+    # Main body
+    body_width = width * 0.6
+    body_x = x + (width - body_width) // 2
+    
+    # Draw main body
+    body_points = [
+        (body_x + body_width*0.5, y),  # top point
+        (body_x + body_width, y + height*0.3),  # right top
+        (body_x + body_width, y + height*0.7),  # right bottom
+        (body_x + body_width*0.5, y + height),  # bottom point
+        (body_x, y + height*0.7),  # left bottom
+        (body_x, y + height*0.3),  # left top
+    ]
+    
+    # Draw body shadow
+    shadow_points = [(p[0], p[1] + 2) for p in body_points]
+    pygame.draw.polygon(surface, DARKER_GREEN, shadow_points)
+    
+    # Main body
+    pygame.draw.polygon(surface, GREEN, body_points)
+    pygame.draw.polygon(surface, DARK_GREEN, body_points, 2)
+    
+    # Draw rotors
+    rotor_radius = width * 0.25
+    left_rotor = (x + width*0.2, y + height*0.5)
+    right_rotor = (x + width*0.8, y + height*0.5)
+    
+    for center in [left_rotor, right_rotor]:
+        pygame.draw.circle(surface, GREEN, (int(center[0]), int(center[1])), int(rotor_radius))
+        pygame.draw.circle(surface, DARK_GREEN, (int(center[0]), int(center[1])), int(rotor_radius), 2)
+        pygame.draw.circle(surface, DARK_GREEN, (int(center[0]), int(center[1])), int(rotor_radius*0.7))
+        pygame.draw.circle(surface, YELLOW, (int(center[0]), int(center[1])), int(rotor_radius*0.2))
+        pygame.draw.circle(surface, WHITE, (int(center[0]), int(center[1])), int(rotor_radius*0.1))
 
 class Aircraft:
-    def __init__(self, x, y):
+    __slots__ = ("x", "y", "prev_x", "prev_y", "palette", "rect")
+    # Room around the sprite for the rotors and the body shadow
+    SPRITE_PAD = 4
+    width = 50
+    height = 40
+    speed = 5
+
+    def __init__(self, x, y, palette=AIRCRAFT_PALETTE):
         self.x = x
         self.y = y
-        self.width = 50
-        self.height = 40
-        self.speed = 5
+        # Position before the last move, for drawing between steps
+        self.prev_x = x
+        self.prev_y = y
+        self.palette = palette
         self.rect = pygame.Rect(x, y, self.width, self.height)
 
     def move(self, dx, dy):
+        self.prev_x, self.prev_y = self.x, self.y
         self.x = max(0, min(800 - self.width, self.x + dx))
         self.y = max(100, min(600 - self.height - 20, self.y + dy))
         self.rect.x = self.x
         self.rect.y = self.y
 
-    def draw(self, surface):
-        # Colors
-        GREEN = (100, 255, 0)
-        DARK_GREEN = (50, 180, 0)
-        DARKER_GREEN = (30, 130, 0)
-        YELLOW = (255, 255, 0)
-        WHITE = (255, 255, 255)
-        
-        # Main body
-        body_width = self.width * 0.6
-        body_x = self.x + (self.width - body_width) // 2
-        
-        # Draw main body
-        body_points = [
-            (body_x + body_width*0.5, self.y),  # top point
-            (body_x + body_width, self.y + self.height*0.3),  # right top
-            (body_x + body_width, self.y + self.height*0.7),  # right bottom
-            (body_x + body_width*0.5, self.y + self.height),  # bottom point
-            (body_x, self.y + self.height*0.7),  # left bottom
-            (body_x, self.y + self.height*0.3),  # left top
-        ]
-        
-        # Draw body shadow
-        shadow_points = [(p[0], p[1] + 2) for p in body_points]
-        pygame.draw.polygon(surface, DARKER_GREEN, shadow_points)
-        
-        # Main body
-        pygame.draw.polygon(surface, GREEN, body_points)
-        pygame.draw.polygon(surface, DARK_GREEN, body_points, 2)
-        
-        # Draw rotors
-        rotor_radius = self.width * 0.25
-        left_rotor = (self.x + self.width*0.2, self.y + self.height*0.5)
-        right_rotor = (self.x + self.width*0.8, self.y + self.height*0.5)
-        
-        for center in [left_rotor, right_rotor]:
-            pygame.draw.circle(surface, GREEN, (int(center[0]), int(center[1])), int(rotor_radius))
-            pygame.draw.circle(surface, DARK_GREEN, (int(center[0]), int(center[1])), int(rotor_radius), 2)
-            pygame.draw.circle(surface, DARK_GREEN, (int(center[0]), int(center[1])), int(rotor_radius*0.7))
-            pygame.draw.circle(surface, YELLOW, (int(center[0]), int(center[1])), int(rotor_radius*0.2))
-            pygame.draw.circle(surface, WHITE, (int(center[0]), int(center[1])), int(rotor_radius*0.1))
+    def bake(self):
+        pad = self.SPRITE_PAD
+        sprite = pygame.Surface((self.width + pad * 2, self.height + pad * 2), pygame.SRCALPHA)
+        render_aircraft(sprite, pad, pad, self.width, self.height, self.palette)
+        return sprite
 
-class Missile:
-    def __init__(self, x, speed):
-        self.x = x
-        self.y = -40
-        self.width = 20
-        self.height = 40
-        self.speed = speed
-        self.flame_timer = 0
-        self.rect = pygame.Rect(x, -40, self.width, self.height)
+    def draw(self, surface, blend=1.0):
+        sprite = sprite_cache.get(("aircraft", self.width, self.height, self.palette), self.bake)
+        x = lerp(self.prev_x, self.x, blend)
+        y = lerp(self.prev_y, self.y, blend)
+        return surface.blit(sprite, (x - self.SPRITE_PAD, y - self.SPRITE_PAD))
 
-    def update(self):
-        self.y += self.speed
-        self.rect.y = self.y
-        self.flame_timer += 0.2
+class Missile(MissileView):
+    __slots__ = ()
 
     def draw(self, surface):
-        ORANGE = (255, 140, 0)
-        GRAY = (128, 128, 128)
-        YELLOW = (255, 255, 0)
+        ORANGE, GRAY, YELLOW = MISSILE_PALETTE
+        x, y = self.draw_x, self.draw_y
         
         # Draw missile body
-        pygame.draw.rect(surface, GRAY, 
-                        (self.x + self.width*0.2, self.y + self.height*0.4, 
+        body_rect = pygame.draw.rect(surface, GRAY, 
+                        (x + self.width*0.2, y + self.height*0.4, 
                          self.width*0.6, self.height*0.4))
         
         # Draw missile nose
         nose_points = [
-            (self.x + self.width/2, self.y + self.height),
-            (self.x + self.width, self.y + self.height*0.8),
-            (self.x, self.y + self.height*0.8)
+            (x + self.width/2, y + self.height),
+            (x + self.width, y + self.height*0.8),
+            (x, y + self.height*0.8)
         ]
-        pygame.draw.polygon(surface, ORANGE, nose_points)
+        nose_rect = pygame.draw.polygon(surface, ORANGE, nose_points)
         
         # Draw flame
         flame_height = abs(math.sin(self.flame_timer)) * 20
         flame_points = [
-            (self.x + self.width/2, self.y),
-            (self.x, self.y + self.height*0.2 + flame_height),
-            (self.x + self.width, self.y + self.height*0.2 + flame_height)
+            (x + self.width/2, y),
+            (x, y + self.height*0.2 + flame_height),
+            (x + self.width, y + self.height*0.2 + flame_height)
         ]
-        pygame.draw.polygon(surface, YELLOW, flame_points)
+        flame_rect = pygame.draw.polygon(surface, YELLOW, flame_points)
+        return body_rect.unionall([nose_rect, flame_rect])
 
 class Explosion:
-    def __init__(self, x, y):
+    __slots__ = ("x", "y", "radius", "alpha", "done")
+    COLOR = (255, 165, 0)
+    start_radius = 5
+    max_radius = 40
+    growth_rate = 2
+    fade_rate = 8
+    particle_sizes = (2, 4)  # Smallest and largest particle radius
+
+    def __init__(self, x, y, particles, rng):
+        self.reset(x, y, particles, rng)
+
+    def reset(self, x, y, particles, rng):
+        """Set up a fresh explosion in place, so pooled ones can be reused"""
         self.x = x
         self.y = y
-        self.radius = 5
-        self.max_radius = 40
-        self.growth_rate = 2
+        self.radius = self.start_radius
         self.alpha = 255
-        self.fade_rate = 8
-        self.particles = []
         self.done = False
         
         # Create explosion particles
+        dx, dy, sizes = [], [], []
         for _ in range(20):
-            angle = random.uniform(0, math.pi * 2)
-            speed = random.uniform(2, 6)
-            self.particles.append({
-                'x': self.x,
-                'y': self.y,
-                'dx': math.cos(angle) * speed,
-                'dy': math.sin(angle) * speed,
-                'size': random.randint(2, 4),
-                'alpha': 255
-            })
+            angle = rng.uniform(0, math.pi * 2)
+            speed = rng.uniform(2, 6)
+            dx.append(math.cos(angle) * speed)
+            dy.append(math.sin(angle) * speed)
+            sizes.append(rng.randint(*self.particle_sizes))
+        particles.emit(self.x, self.y, dx, dy, sizes, self.fade_rate)
 
     def update(self):
-        # Update main explosion
+        # Update main explosion; the particles are moved by the ParticleEngine
         if self.radius < self.max_radius:
             self.radius += self.growth_rate
         self.alpha = max(0, self.alpha - self.fade_rate)
         
-        # Update particles
-        for particle in self.particles:
-            particle['x'] += particle['dx']
-            particle['y'] += particle['dy']
-            particle['alpha'] = max(0, particle['alpha'] - self.fade_rate)
-        
-        # Check if explosion is complete
-        if self.alpha <= 0 and all(p['alpha'] <= 0 for p in self.particles):
+        # Particles start at the same alpha and fade at the same rate,
+        # so they are all gone by the time the main explosion is
+        if self.alpha <= 0:
             self.done = True
 
+    @classmethod
+    def sprite(cls, radius, alpha):
+        return sprite_cache.get(("explosion", radius, alpha), lambda: bake_circle(radius, cls.COLOR, alpha))
+
+    @classmethod
+    def bake_frames(cls, particles):
+        """Bake every circle an explosion and its particles go through, before the first one goes off"""
+        radius, alpha = cls.start_radius, 255
+        while alpha > 0:
+            cls.sprite(radius, alpha)
+            if radius < cls.max_radius:
+                radius += cls.growth_rate
+            alpha -= cls.fade_rate
+        smallest, largest = cls.particle_sizes
+        particles.bake(range(smallest, largest + 1), cls.fade_rate)
+
     def draw(self, surface):
         # Draw main explosion circle
         if self.alpha > 0:
-            explosion_surface = pygame.Surface((self.radius * 2, self.radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(explosion_surface, (255, 165, 0, self.alpha), 
-                             (self.radius, self.radius), self.radius)
-            surface.blit(explosion_surface, (self.x - self.radius, self.y - self.radius))
-        
-        # Draw particles
-        for particle in self.particles:
-            if particle['alpha'] > 0:
-                particle_surface = pygame.Surface((particle['size'] * 2, particle['size'] * 2), pygame.SRCALPHA)
-                pygame.draw.circle(particle_surface, (255, 100, 0, particle['alpha']),
-                                 (particle['size'], particle['size']), particle['size'])
-                surface.blit(particle_surface, (particle['x'] - particle['size'], particle['y'] - particle['size']))
+            return surface.blit(self.sprite(self.radius, self.alpha), (self.x - self.radius, self.y - self.radius))
 
 class Planet:
-    def __init__(self, x, y, size):
+    __slots__ = ("x", "y", "size", "ring_angle", "base_color", "detail_color", "speed",
+                 "surface_details", "sprite_key", "rng")
+    # Room around the body for the glow
+    GLOW = 6
+
+    def __init__(self, x, y, size, rng):
         self.x = x
         self.y = y
         self.size = size
-        self.ring_angle = random.uniform(-math.pi/6, math.pi/6)  # Slight ring tilt
+        self.rng = rng
+        self.randomize()
+
+    def randomize(self):
+        size = self.size
+        rng = self.rng
+        self.ring_angle = rng.uniform(-math.pi/6, math.pi/6)  # Slight ring tilt
         # Gray color scheme
         self.base_color = (
-            random.randint(150, 180),  # Gray base
-            random.randint(150, 180),
-            random.randint(150, 180)
+            rng.randint(150, 180),  # Gray base
+            rng.randint(150, 180),
+            rng.randint(150, 180)
         )
         # Darker gray for surface details
         self.detail_color = (
@@ -178,59 +242,412 @@ class Planet:
             max(self.base_color[1] - 40, 0),
             max(self.base_color[2] - 40, 0)
         )
-        self.speed = random.uniform(0.2, 0.4)  # Even slower movement
+        self.speed = rng.uniform(0.2, 0.4)  # Even slower movement
         # Surface detail positions
         self.surface_details = []
         for _ in range(4):  # Add 4 surface details
-            angle = random.uniform(0, math.pi * 2)
-            dist = random.uniform(0.2, 0.8) * size
+            angle = rng.uniform(0, math.pi * 2)
+            dist = rng.uniform(0.2, 0.8) * size
             self.surface_details.append({
                 'angle': angle,
                 'dist': dist,
-                'size': random.uniform(0.15, 0.3) * size
+                'size': rng.uniform(0.15, 0.3) * size
             })
+        
+        # The look never changes until the next randomize(), so bake it now,
+        # unless nothing is being displayed (headless runs bake on first draw)
+        self.sprite_key = ("planet", self.size, self.base_color, self.detail_color, self.ring_angle,
+                           tuple((d['angle'], d['dist'], d['size']) for d in self.surface_details))
+        if pygame.display.get_surface() is not None:
+            sprite_cache.get(self.sprite_key, self.bake)
 
     def update(self):
         self.y += self.speed  # Move from top to bottom
         if self.y - self.size > 600:  # Reset position when off screen
             self.y = -self.size * 2
-            self.x = random.randint(self.size, 800 - self.size)
+            self.x = self.rng.randint(self.size, 800 - self.size)
 
-    def draw(self, surface):
+    def bake(self):
+        # Ring, rotated once
+        ring_surface = pygame.Surface((self.size * 4, self.size * 2), pygame.SRCALPHA)
+        # Draw main ring
+        pygame.draw.ellipse(ring_surface, (*self.base_color, 120), 
+                          (0, self.size//2, self.size * 4, self.size))
+        # Draw ring shadow
+        pygame.draw.ellipse(ring_surface, (*self.detail_color, 80), 
+                          (self.size//2, self.size//2 + 2, self.size * 3, self.size//2))
+        rotated_ring = pygame.transform.rotate(ring_surface, math.degrees(self.ring_angle))
+        
+        glow_radius = self.size + self.GLOW
+        width = max(glow_radius * 2, rotated_ring.get_width())
+        height = max(glow_radius * 2, rotated_ring.get_height())
+        sprite = pygame.Surface((width, height), pygame.SRCALPHA)
+        center_x, center_y = width // 2, height // 2
+        
         # Draw planet glow
-        glow_radius = self.size + 6
-        glow_surface = pygame.Surface((glow_radius * 2, glow_radius * 2), pygame.SRCALPHA)
-        pygame.draw.circle(glow_surface, (*self.base_color, 30), 
-                         (glow_radius, glow_radius), glow_radius)
-        surface.blit(glow_surface, 
-                    (int(self.x) - glow_radius, int(self.y) - glow_radius))
+        pygame.draw.circle(sprite, (*self.base_color, 30), (center_x, center_y), glow_radius)
         
         # Draw base planet
-        pygame.draw.circle(surface, self.base_color, (int(self.x), int(self.y)), self.size)
+        pygame.draw.circle(sprite, self.base_color, (center_x, center_y), self.size)
         
         # Draw surface details (craters/spots)
         for detail in self.surface_details:
-            detail_x = self.x + math.cos(detail['angle']) * detail['dist']
-            detail_y = self.y + math.sin(detail['angle']) * detail['dist']
-            pygame.draw.circle(surface, self.detail_color, 
+            detail_x = center_x + math.cos(detail['angle']) * detail['dist']
+            detail_y = center_y + math.sin(detail['angle']) * detail['dist']
+            pygame.draw.circle(sprite, self.detail_color, 
                              (int(detail_x), int(detail_y)), 
                              int(detail['size']))
         
         # Draw ring
-        ring_surface = pygame.Surface((self.size * 4, self.size * 2), pygame.SRCALPHA)
-        # Draw main ring
-        pygame.draw.ellipse(ring_surface, (*self.base_color, 120), 
-                          (0, self.size//2, self.size * 4, self.size))
-        # Draw ring shadow
-        pygame.draw.ellipse(ring_surface, (*self.detail_color, 80), 
-                          (self.size//2, self.size//2 + 2, self.size * 3, self.size//2))
+        sprite.blit(rotated_ring, (center_x - rotated_ring.get_width()//2,
+                                   center_y - rotated_ring.get_height()//2))
+        return sprite
+
+    def draw(self, surface):
+        sprite = sprite_cache.get(self.sprite_key, self.bake)
+        return surface.blit(sprite, (int(self.x) - sprite.get_width()//2,
+                              int(self.y) - sprite.get_height()//2))
+
+# Set up display
+WIDTH = 800
+HEIGHT = 600
+
+# Colors
+WHITE = (255, 255, 255)
+BACKGROUND_COLOR = (0, 0, 40)
+
+class Starfield:
+    """Background colour and static stars, rendered once into a cached layer.
+
+    The stars never move, so the layer is only drawn again when the canvas
+    size or the seed changes.
+    """
+    __slots__ = ("seed", "count")
+
+    def __init__(self, seed, count=200):
+        self.seed = seed
+        self.count = count
+
+    def bake(self, size):
+        width, height = size
+        layer = pygame.Surface(size)
+        layer.fill(BACKGROUND_COLOR)
+        rng = random.Random(self.seed)
+        for _ in range(self.count):
+            x = rng.randint(0, width)
+            y = rng.randint(0, height)
+            star_size = rng.randint(1, 3)
+            pygame.draw.circle(layer, WHITE, (x, y), star_size)
+        return layer
+
+    def key(self, size):
+        return ("starfield", size, self.seed, self.count)
+
+    def layer(self, size):
+        return sprite_cache.get(self.key(size), lambda: self.bake(size), alpha=False)
+
+    def draw(self, canvas):
+        return canvas.blit(self.layer(canvas.get_size()), (0, 0))
+
+# Key state with nothing held down, for runs without a keyboard
+NO_KEYS = defaultdict(bool)
+
+class Game:
+    def __init__(self, sounds=None, seed=None):
+        self.sounds = sounds or {}
+        # Separate random streams, so effects and scenery never shift gameplay
+        self.rng = RandomStreams(seed)
         
-        rotated_ring = pygame.transform.rotate(ring_surface, math.degrees(self.ring_angle))
-        surface.blit(rotated_ring, 
-                    (self.x - rotated_ring.get_width()//2,
-                     self.y - rotated_ring.get_height()//2))
+        # Game objects
+        self.starfield = Starfield(self.rng.stars.getrandbits(32))
+        
+        # Game state
+        self.missiles = MissileStore(Missile, 20, 40)
+        self.restart()
+        self.missile_timer = 0
+        
+        # Add explosions list to game state
+        self.explosions = EntityList()
+        self.explosion_pool = ObjectPool(Explosion, 16)
+        self.particles = ParticleEngine(sprite_cache)
+        # Explosions look the same every time, so bake them all now rather than mid game
+        # over, unless nothing is being displayed (headless runs bake on first draw)
+        if pygame.display.get_surface() is not None:
+            Explosion.bake_frames(self.particles)
+        
+        # Create just one planet
+        self.planets = []
+        rng = self.rng.planets
+        x = rng.randint(100, WIDTH-100)
+        y = rng.randint(-200, -100)  # Start above the screen
+        size = rng.randint(25, 35)  # Slightly larger size
+        self.planets.append(Planet(x, y, size, rng))
+
+    def restart(self):
+        self.game_started = False
+        self.game_over = False
+        self.score = 0
+        self.set_level(1)
+        self.missiles.clear()
+        # Create player
+        self.player = Aircraft(WIDTH//2 - 25, HEIGHT - 60)
 
-async def main():
+    def start(self):
+        self.game_started = True
+
+    def pool_stats(self):
+        """PoolStats of every pool-like container, keyed by the names in POOLS"""
+        return {"missiles": self.missiles.stats, "explosions": self.explosion_pool.stats,
+                "particles": self.particles.stats}
+
+    def set_level(self, level):
+        settings = DIFFICULTY[level]
+        self.level = level
+        self.missile_speed = settings.speed
+        self.spawn_interval = settings.spawn_interval
+        self.missiles_per_wave = settings.wave
+        self.max_missiles = settings.max_missiles
+
+    def discard_sprites(self, size=(WIDTH, HEIGHT)):
+        """Drop the cached sprites only this game draws: its planets and starfield"""
+        for planet in self.planets:
+            sprite_cache.discard(planet.sprite_key)
+        sprite_cache.discard(self.starfield.key(size))
+
+    def play_sound(self, name):
+        try:
+            if name in self.sounds:
+                self.sounds[name].play()
+        except:
+            pass
+
+    def update(self, keys):
+        """Advance the game by one fixed step without drawing anything"""
+        # Update planets
+        for planet in self.planets:
+            planet.update()
+        
+        if not self.game_started:
+            profiler.mark("update")
+            return
+        
+        if not self.game_over:
+            player = self.player
+            # Move player
+            dx = (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]) * player.speed
+            dy = (keys[pygame.K_DOWN] - keys[pygame.K_UP]) * player.speed
+            player.move(dx, dy)
+            profiler.mark("update")
+            
+            # Spawn missiles
+            self.missile_timer += 1
+            if self.missile_timer >= self.spawn_interval:
+                # Never more missiles in flight than the level allows
+                for _ in range(min(self.missiles_per_wave, self.max_missiles - len(self.missiles))):
+                    self.missiles.spawn(self.rng.spawn.randint(0, WIDTH - 20), -40, speed=self.missile_speed)
+                    self.play_sound("missile")
+                self.missile_timer = 0
+            profiler.mark("spawn")
+            
+            # Update and check missiles in one pass
+            missiles = self.missiles
+            missiles.update()
+            profiler.mark("update")
+            off_screen = missiles.below(HEIGHT)
+            hits = np.flatnonzero(missiles.colliding(player.rect))
+            for _ in range(int(np.count_nonzero(off_screen))):
+                self.score += 1
+                # Level up at the scores in the difficulty table
+                if DIFFICULTY.levelled_up(self.level, self.score):
+                    self.set_level(self.level + 1)
+                    self.play_sound("levelup")
+            missiles.kill(off_screen)
+            
+            for index in hits.tolist():
+                missile = missiles[index]
+                self.game_over = True
+                # Create explosion at collision point
+                explosion_pool, effects = self.explosion_pool, self.rng.effects
+                self.explosions.add(explosion_pool.acquire(missile.x + missile.width/2,
+                                                           missile.y + missile.height/2,
+                                                           self.particles, effects))
+                self.explosions.add(explosion_pool.acquire(player.x + player.width/2,
+                                                           player.y + player.height/2,
+                                                           self.particles, effects))
+                # Remove the missile that caused the collision
+                missile.destroyed = True
+                self.play_sound("explosion")
+                try:
+                    pygame.mixer.music.stop()
+                except:
+                    pass
+            missiles.compact()
+            profiler.mark("collision")
+        
+        # Update explosions
+        self.particles.update()
+        for handle, explosion in self.explosions.items():
+            explosion.update()
+            if explosion.done:
+                self.explosions.remove(handle)
+        self.explosion_pool.release_all(self.explosions.flush())
+        profiler.mark("update")
+
+    def draw(self, canvas, clear=True, blend=1.0):
+        """Draw the frame and return the rects that were drawn to.
+
+        With clear=False the background is left alone, for the dirty-rect
+        renderer that restores it itself. Moving objects are drawn blend of
+        the way from their previous step to the current one.
+        """
+        rects = []
+        
+        # Clear screen and draw stars
+        if clear:
+            rects.append(self.starfield.draw(canvas))
+        profiler.mark("draw background")
+        
+        # Draw planets
+        for planet in self.planets:
+            rects.append(planet.draw(canvas))
+        profiler.mark("draw planets")
+        
+        if not self.game_started:
+            # Draw title screen
+            title = render_text(74, "Missile Invasion", WHITE)
+            title_rect = title.get_rect(center=(WIDTH//2, HEIGHT//3))
+            rects.append(canvas.blit(title, title_rect))
+            
+            text = render_text(36, "Press SPACE to start", WHITE)
+            text_rect = text.get_rect(center=(WIDTH//2, HEIGHT//2))
+            rects.append(canvas.blit(text, text_rect))
+            
+            # Draw controls info
+            controls_text = render_text(36, "Arrow keys to move", (200, 200, 200))
+            controls_rect = controls_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 50))
+            rects.append(canvas.blit(controls_text, controls_rect))
+            profiler.mark("hud")
+            return rects
+        
+        # Draw explosions
+        for explosion in self.explosions:
+            rects.append(explosion.draw(canvas))
+        rects.extend(self.particles.draw(canvas, blend))
+        profiler.mark("draw explosions")
+        
+        # Draw game objects
+        if not self.game_over:
+            rects.append(self.player.draw(canvas, blend))
+        self.missiles.blend = blend
+        for missile in self.missiles:
+            rects.append(missile.draw(canvas))
+        profiler.mark("draw objects")
+        
+        # Draw game info, only rendered again when a value changes
+        # Score
+        score_text = render_text(36, f"Score: {self.score}", WHITE)
+        rects.append(canvas.blit(score_text, (10, 10)))
+        # Level
+        level_text = render_text(36, f"Level: {self.level}", WHITE)
+        rects.append(canvas.blit(level_text, (10, 50)))
+        # Speed
+        speed_text = render_text(36, f"Speed: {self.missile_speed:.1f}", WHITE)
+        rects.append(canvas.blit(speed_text, (10, 90)))
+        # Missiles per wave
+        missile_text = render_text(36, f"Missiles: {self.missiles_per_wave}", WHITE)
+        rects.append(canvas.blit(missile_text, (10, 130)))
+        
+        # Draw game over screen
+        if self.game_over:
+            text = render_text(74, "Game Over!", WHITE)
+            text_rect = text.get_rect(center=(WIDTH//2, HEIGHT//2))
+            rects.append(canvas.blit(text, text_rect))
+            
+            text = render_text(36, "Press R to restart", WHITE)
+            text_rect = text.get_rect(center=(WIDTH//2, HEIGHT//2 + 50))
+            rects.append(canvas.blit(text, text_rect))
+        profiler.mark("hud")
+        return rects
+
+# Pools whose high-water marks and misses go into telemetry
+POOLS = ("missiles", "explosions", "particles")
+
+def open_telemetry(path):
+    counts = [("missiles", "i4"), ("explosions", "i4"), ("particles", "i4"), ("level", "i4"),
+              ("missile_speed", "f8"), ("missiles_per_wave", "i4")]
+    return TelemetryRecorder(path, frame_columns(counts, PHASES, POOLS))
+
+def record_frame(telemetry, game, steps=1, late=False, backlog_dropped=False):
+    telemetry.record(profiler.frame_phases, steps=steps, missiles=len(game.missiles),
+                     explosions=len(game.explosions), particles=len(game.particles),
+                     level=game.level, missile_speed=game.missile_speed,
+                     missiles_per_wave=game.missiles_per_wave, late=late,
+                     backlog_dropped=backlog_dropped, **pool_values(game.pool_stats()))
+
+def run_headless(frames, seed=0, telemetry_path=None):
+    """Step the game logic as fast as possible and report simulated frames per second.
+
+    Uses SDL's dummy drivers and never draws or flips, so it measures pure
+    game logic and runs on machines without a display. Nobody is at the
+    keyboard, so the player sits still and the game restarts after every
+    game over.
+    """
+    cli.use_dummy_drivers()
+    pygame.init()
+    
+    game = Game(seed=seed)
+    game.start()
+    telemetry = open_telemetry(telemetry_path) if telemetry_path else None
+    profiler.start()
+    start = time.perf_counter()
+    for _ in range(frames):
+        game.update(NO_KEYS)
+        if game.game_over and not game.explosions:
+            game.restart()
+            game.start()
+        if telemetry is not None:
+            profiler.end_frame()
+            record_frame(telemetry, game)
+    elapsed = time.perf_counter() - start
+    if telemetry is not None:
+        telemetry.close()
+    
+    return cli.report_headless(frames, elapsed, seed, game.pool_stats())
+
+def play_replay(path):
+    """Re-simulate a recorded session without a display, as fast as possible"""
+    cli.use_dummy_drivers()
+    pygame.init()
+    
+    replay = cli.load_replay(path, "main")
+    game = Game(seed=replay.seed)
+    keys = ReplayKeys()
+    start = time.perf_counter()
+    for step, mask in enumerate(replay.masks()):
+        try:
+            if mask & RESTART:
+                game.restart()
+            if mask & START:
+                game.start()
+            keys.mask = mask
+            game.update(keys)
+        except Exception:
+            print(f"Replay failed at step {step}")
+            raise
+    elapsed = time.perf_counter() - start
+    
+    cli.report_replay(replay, elapsed, game.score, game.level)
+    return game
+
+async def main(headless_frames=None, seed=None, dirty_rects=False, fps=60, telemetry_path=None,
+               record_path=None, replay_path=None):
+    if replay_path is not None:
+        play_replay(replay_path)
+        return
+    if headless_frames is not None:
+        run_headless(headless_frames, seed or 0, telemetry_path)
+        return
+    
     pygame.init()
     pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
     
@@ -257,204 +674,89 @@ async def main():
         print(f"Error loading sounds: {e}")
         sounds = {}
     
-    # Set up display
-    WIDTH = 800
-    HEIGHT = 600
     canvas = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Missile Invasion")
     
-    # Colors
-    WHITE = (255, 255, 255)
-    BACKGROUND_COLOR = (0, 0, 40)
-    
-    # Game objects
-    stars = []
-    for _ in range(200):
-        x = random.randint(0, WIDTH)
-        y = random.randint(0, HEIGHT)
-        size = random.randint(1, 3)
-        stars.append({"x": x, "y": y, "size": size})
-    
-    # Game state
-    game_started = False
-    game_over = False
-    score = 0
-    level = 1
-    missile_speed = 5
-    missiles_per_wave = 1
-    last_level_up = 0
-    
-    # Create player
-    player = Aircraft(WIDTH//2 - 25, HEIGHT - 60)
-    missiles = []
-    missile_timer = 0
+    game = Game(sounds, seed)
+    # Input for every step, to play the session back later
+    replay = Replay("main", game.rng.seed) if record_path else None
+    # Opt-in: only repaint and push the parts of the screen that changed
+    renderer = DirtyRectRenderer(canvas, game.starfield.layer(canvas.get_size())) if dirty_rects else None
     
-    # Add explosions list to game state
-    explosions = []
-    
-    # Create just one planet
-    planets = []
-    x = random.randint(100, WIDTH-100)
-    y = random.randint(-200, -100)  # Start above the screen
-    size = random.randint(25, 35)  # Slightly larger size
-    planets.append(Planet(x, y, size))
-    
-    # Game loop
+    # Game loop; the game always steps at 60 Hz, whatever fps frames are drawn at
     clock = pygame.time.Clock()
+    timestep = FixedTimestep(60)
+    frame_budget = cli.frame_budget(fps, timestep)
+    telemetry = open_telemetry(telemetry_path) if telemetry_path else None
     running = True
     
+    # Setup above isn't part of the first frame
+    profiler.start()
     while running:
         # Handle events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE and not game_started:
-                    game_started = True
-                elif event.key == pygame.K_r and game_over:
+                if event.key == pygame.K_SPACE and not game.game_started:
+                    game.start()
+                    if replay is not None:
+                        replay.action(START)
+                elif event.key == pygame.K_r and game.game_over:
                     # Reset game
-                    game_started = False
-                    game_over = False
-                    score = 0
-                    level = 1
-                    missile_speed = 5
-                    missiles_per_wave = 1
-                    last_level_up = 0
-                    missiles.clear()
-                    player = Aircraft(WIDTH//2 - 25, HEIGHT - 60)
+                    game.restart()
+                    if replay is not None:
+                        replay.action(RESTART)
                     # Restart background music
                     try:
                         pygame.mixer.music.play(-1)
                     except:
                         pass
+                elif event.key == pygame.K_F3:
+                    profiler.toggle()
+        profiler.mark("events")
         
         # Get keyboard state
         keys = pygame.key.get_pressed()
+        profiler.mark("input")
         
-        # Clear screen
-        canvas.fill(BACKGROUND_COLOR)
-        
-        # Draw stars
-        for star in stars:
-            pygame.draw.circle(canvas, WHITE, (star["x"], star["y"]), star["size"])
-        
-        # Update and draw planets
-        for planet in planets:
-            planet.update()
-            planet.draw(canvas)
-        
-        if not game_started:
-            # Draw title screen
-            font = pygame.font.Font(None, 74)
-            title = font.render("Missile Invasion", True, WHITE)
-            title_rect = title.get_rect(center=(WIDTH//2, HEIGHT//3))
-            canvas.blit(title, title_rect)
-            
-            font = pygame.font.Font(None, 36)
-            text = font.render("Press SPACE to start", True, WHITE)
-            text_rect = text.get_rect(center=(WIDTH//2, HEIGHT//2))
-            canvas.blit(text, text_rect)
-            
-            # Draw controls info
-            controls_text = font.render("Arrow keys to move", True, (200, 200, 200))
-            controls_rect = controls_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 50))
-            canvas.blit(controls_text, controls_rect)
-        else:
-            if not game_over:
-                # Move player
-                dx = (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]) * player.speed
-                dy = (keys[pygame.K_DOWN] - keys[pygame.K_UP]) * player.speed
-                player.move(dx, dy)
-                
-                # Spawn missiles
-                missile_timer += 1
-                if missile_timer >= max(20, 60 - level * 2):  # Spawn rate increases with level
-                    for _ in range(missiles_per_wave):
-                        missiles.append(Missile(random.randint(0, WIDTH - 20), missile_speed))
-                        try:
-                            if "missile" in sounds:
-                                sounds["missile"].play()
-                        except:
-                            pass
-                    missile_timer = 0
-                
-                # Update and check missiles
-                for missile in missiles[:]:
-                    missile.update()
-                    if missile.y > HEIGHT:
-                        missiles.remove(missile)
-                        score += 1
-                        # Level up every 30 points
-                        if score > 0 and score % 30 == 0 and score != last_level_up:
-                            level += 1
-                            missile_speed += 0.5
-                            if level % 2 == 0:  # Increase missiles every 2 levels
-                                missiles_per_wave += 1
-                            last_level_up = score
-                            try:
-                                if "levelup" in sounds:
-                                    sounds["levelup"].play()
-                            except:
-                                pass
-                    elif missile.rect.colliderect(player.rect):
-                        game_over = True
-                        # Create explosion at collision point
-                        explosions.append(Explosion(missile.x + missile.width/2, missile.y + missile.height/2))
-                        explosions.append(Explosion(player.x + player.width/2, player.y + player.height/2))
-                        # Remove the missile that caused the collision
-                        missiles.remove(missile)
-                        try:
-                            if "explosion" in sounds:
-                                sounds["explosion"].play()
-                            pygame.mixer.music.stop()
-                        except:
-                            pass
-            
-            # Update and draw explosions
-            for explosion in explosions[:]:
-                explosion.update()
-                explosion.draw(canvas)
-                if explosion.done:
-                    explosions.remove(explosion)
-            
-            # Draw game objects
-            if not game_over:
-                player.draw(canvas)
-            for missile in missiles:
-                missile.draw(canvas)
-            
-            # Draw game info
-            font = pygame.font.Font(None, 36)
-            # Score
-            score_text = font.render(f"Score: {score}", True, WHITE)
-            canvas.blit(score_text, (10, 10))
-            # Level
-            level_text = font.render(f"Level: {level}", True, WHITE)
-            canvas.blit(level_text, (10, 50))
-            # Speed
-            speed_text = font.render(f"Speed: {missile_speed:.1f}", True, WHITE)
-            canvas.blit(speed_text, (10, 90))
-            # Missiles per wave
-            missile_text = font.render(f"Missiles: {missiles_per_wave}", True, WHITE)
-            canvas.blit(missile_text, (10, 130))
-            
-            # Draw game over screen
-            if game_over:
-                font = pygame.font.Font(None, 74)
-                text = font.render("Game Over!", True, WHITE)
-                text_rect = text.get_rect(center=(WIDTH//2, HEIGHT//2))
-                canvas.blit(text, text_rect)
-                
-                font = pygame.font.Font(None, 36)
-                text = font.render("Press R to restart", True, WHITE)
-                text_rect = text.get_rect(center=(WIDTH//2, HEIGHT//2 + 50))
-                canvas.blit(text, text_rect)
+        steps = timestep.advance()
+        for _ in range(steps):
+            if replay is not None:
+                replay.record(keys)
+            game.update(keys)
         
         # Update display
-        pygame.display.flip()
+        if renderer is None:
+            game.draw(canvas, blend=timestep.blend)
+            profiler.draw(canvas)
+            profiler.mark("profiler")
+            pygame.display.flip()
+        else:
+            renderer.restore()
+            rects = game.draw(canvas, clear=False, blend=timestep.blend)
+            rects.append(profiler.draw(canvas))
+            profiler.mark("profiler")
+            renderer.present(rects)
+        profiler.mark("flip")
         
         # Control frame rate
-        clock.tick(60)
+        clock.tick(fps)
+        profiler.mark("tick wait")
+        profiler.end_frame(missiles=len(game.missiles), explosions=len(game.explosions),
+                           particles=len(game.particles))
+        if telemetry is not None:
+            late = cli.is_late(profiler.frame_phases, frame_budget)
+            record_frame(telemetry, game, steps, late, timestep.dropped)
         await asyncio.sleep(0)
+    
+    if telemetry is not None:
+        telemetry.close()
+    if replay is not None:
+        replay.save(record_path)
 
-asyncio.run(main()) 
\ No newline at end of file
+if __name__ == "__main__":
+    # The web build can pass extra arguments of its own
+    args = cli.parse_args("Missile Invasion", ignore_unknown=True)
+    asyncio.run(main(args.headless, args.seed, args.dirty_rects, args.fps, args.telemetry,
+                     args.record, args.replay))
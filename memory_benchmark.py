@@ -0,0 +1,91 @@
+"""Report how many bytes each game entity takes.
+
+Every slotted entity class is measured twice: as it is, and as a plain
+dict-backed object carrying the same attributes, which is how the classes
+used to be written. Attribute values are shared between the copies, so the
+numbers are the per-object overhead that multiplies with entity counts.
+Missiles and particles live in NumPy arrays, so their cost is one row of
+each array.
+
+    python memory_benchmark.py [--count N]
+"""
+import argparse
+import copy
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+# No window or audio device needed, and dodge_game opens its display on import
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import pygame
+
+
+def slot_names(cls):
+    names = []
+    for klass in reversed(cls.__mro__):
+        names.extend(getattr(klass, "__slots__", ()))
+    return names
+
+
+def dict_backed_copy(entity):
+    """A plain object with entity's attributes in its __dict__"""
+    plain = type(type(entity).__name__, (), {})()
+    for name in slot_names(type(entity)):
+        setattr(plain, name, getattr(entity, name))
+    return plain
+
+
+def bytes_per_object(make, count):
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = [make() for _ in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - start - sys.getsizeof(objects)
+    tracemalloc.stop()
+    del objects
+    return used / count
+
+
+def row_bytes(*arrays):
+    return sum(array.itemsize for array in arrays)
+
+
+def main(count=10000):
+    pygame.init()
+    import main as missile_invasion
+    import dodge_game
+
+    particles = missile_invasion.ParticleEngine(missile_invasion.sprite_cache)
+    rng = random.Random(0)
+    entities = [
+        ("main.Aircraft", missile_invasion.Aircraft(0, 0)),
+        ("main.Explosion", missile_invasion.Explosion(0, 0, particles, rng)),
+        ("main.Planet", missile_invasion.Planet(100, -100, 30, rng)),
+        ("dodge_game.Planet", dodge_game.Planet()),
+        ("dodge_game.Explosion", dodge_game.Explosion(0, 0)),
+    ]
+
+    print(f"{'entity':<24}{'dict-backed':>12}{'slotted':>10}{'saved':>8}")
+    for name, entity in entities:
+        plain = dict_backed_copy(entity)
+        before = bytes_per_object(lambda: copy.copy(plain), count)
+        after = bytes_per_object(lambda: copy.copy(entity), count)
+        print(f"{name:<24}{before:>12.0f}{after:>10.0f}{1 - after / before:>8.0%}")
+
+    store = dodge_game.bullets
+    missile_row = row_bytes(*(getattr(store, field) for field in store.FIELDS), store.alive)
+    particle_row = row_bytes(particles.x, particles.y, particles.dx, particles.dy, particles.size,
+                             particles.alpha, particles.fade_rate, particles.alive)
+    print(f"{'missile (array row)':<24}{'':>12}{missile_row:>10}")
+    print(f"{'particle (array row)':<24}{'':>12}{particle_row:>10}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report bytes per game entity")
+    parser.add_argument("--count", type=int, default=10000, help="objects to allocate per measurement")
+    main(parser.parse_args().count)
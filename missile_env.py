@@ -0,0 +1,136 @@
+"""Gym-style environment over main.py's game logic, for training dodging agents.
+
+    env = MissileInvasionEnv(obs_mode="features")
+    obs = env.reset(seed=1)
+    obs, reward, done, info = env.step(action)
+
+Stepping never opens a window or touches the display, so an environment
+runs as fast as the simulation allows. Nothing is drawn at all in
+"features" mode; "frame" mode renders into an offscreen surface, created
+on the first frame, and shrinks it to frame_size.
+"""
+import numpy as np
+import pygame
+
+from main import Game, WIDTH, HEIGHT
+from replay import ReplayKeys
+
+LEFT, RIGHT, UP, DOWN = 1, 2, 4, 8
+
+# Action index -> held arrow keys, as replay key masks
+ACTIONS = (0, LEFT, RIGHT, UP, DOWN, UP | LEFT, UP | RIGHT, DOWN | LEFT, DOWN | RIGHT)
+
+# Values per missile in the feature vector: dx, dy, fall speed, present
+MISSILE_FEATURES = 4
+
+
+class MissileInvasionEnv:
+    """One game of Missile Invasion, advanced a fixed step at a time.
+
+    Actions index ACTIONS. The reward is the points scored during the step,
+    minus death_penalty on the step the player is hit, which ends the
+    episode. With max_steps set, episodes are also cut off after that many
+    steps, with info["truncated"] set.
+
+    obs_mode "features" gives a float32 vector: the player's centre, then
+    (dx, dy, speed, present) for the `nearest` closest missiles, positions
+    as fractions of the screen. "frame" gives a uint8 (height, width, 3)
+    image of the game, shrunk to frame_size.
+    """
+
+    OBS_MODES = ("features", "frame")
+
+    def __init__(self, obs_mode="features", nearest=5, frame_size=(84, 84), frame_skip=1,
+                 death_penalty=10.0, max_steps=None):
+        if obs_mode not in self.OBS_MODES:
+            raise ValueError(f"obs_mode must be one of {self.OBS_MODES}, not {obs_mode!r}")
+        self.obs_mode = obs_mode
+        self.nearest = nearest
+        self.frame_size = frame_size
+        self.frame_skip = frame_skip
+        self.death_penalty = death_penalty
+        self.max_steps = max_steps
+        self.action_count = len(ACTIONS)
+        if obs_mode == "features":
+            self.observation_shape = (2 + nearest * MISSILE_FEATURES,)
+        else:
+            self.observation_shape = (frame_size[1], frame_size[0], 3)
+
+        self.game = None
+        self.keys = ReplayKeys()
+        self.steps = 0
+        self.canvas = None
+        self.small = None
+
+    def reset(self, seed=None):
+        """Start a new game and return the first observation"""
+        if self.game is not None:
+            # Every game has its own random planets and stars; don't let them pile up
+            self.game.discard_sprites()
+        self.game = Game(seed=seed)
+        self.game.start()
+        self.steps = 0
+        return self.observe()
+
+    def step(self, action):
+        game = self.game
+        self.keys.mask = ACTIONS[action]
+        score = game.score
+        for _ in range(self.frame_skip):
+            game.update(self.keys)
+            self.steps += 1
+            if game.game_over:
+                break
+
+        reward = float(game.score - score)
+        done = game.game_over
+        if done:
+            reward -= self.death_penalty
+        info = {"score": game.score, "level": game.level, "steps": self.steps,
+                "missiles": len(game.missiles)}
+        if not done and self.max_steps is not None and self.steps >= self.max_steps:
+            done = True
+            info["truncated"] = True
+        return self.observe(), reward, done, info
+
+    def observe(self):
+        if self.obs_mode == "features":
+            return self.features()
+        return self.frame()
+
+    def features(self):
+        game = self.game
+        player = game.player
+        missiles = game.missiles
+        obs = np.zeros(self.observation_shape, dtype=np.float32)
+        player_x = player.x + player.width / 2
+        player_y = player.y + player.height / 2
+        obs[0] = player_x / WIDTH
+        obs[1] = player_y / HEIGHT
+
+        n = missiles.count
+        alive = missiles.alive[:n]
+        if alive.any():
+            dx = missiles.x[:n][alive] + missiles.width / 2 - player_x
+            dy = missiles.y[:n][alive] + missiles.height / 2 - player_y
+            nearest = np.argsort(dx * dx + dy * dy)[:self.nearest]
+            rows = obs[2:].reshape(self.nearest, MISSILE_FEATURES)
+            count = len(nearest)
+            rows[:count, 0] = dx[nearest] / WIDTH
+            rows[:count, 1] = dy[nearest] / HEIGHT
+            rows[:count, 2] = missiles.speed[:n][alive][nearest] / 10
+            rows[:count, 3] = 1
+        return obs
+
+    def render(self):
+        """Draw the game into the offscreen canvas, creating it on first use"""
+        if self.canvas is None:
+            self.canvas = pygame.Surface((WIDTH, HEIGHT))
+            self.small = pygame.Surface(self.frame_size)
+        self.game.draw(self.canvas)
+        return self.canvas
+
+    def frame(self):
+        pygame.transform.smoothscale(self.render(), self.frame_size, self.small)
+        # surfarray is indexed (x, y); observations are (row, column, channel)
+        return pygame.surfarray.array3d(self.small).transpose(1, 0, 2)
@@ -0,0 +1,222 @@
+import numpy as np
+import pygame
+
+from pool import PoolStats
+
+
+def round_half_away(values):
+    """Round the way pygame.Rect does when it is given float coordinates"""
+    values = np.asarray(values, dtype=np.float64)
+    return np.trunc(values + np.copysign(0.5, values)).astype(np.int32)
+
+
+def _round_half_away(value):
+    return int(value + 0.5) if value >= 0 else -int(0.5 - value)
+
+
+class MissileView:
+    """Thin handle onto one missile in a MissileStore.
+
+    Views are only valid until the store is compacted, so grab fresh ones
+    each frame instead of keeping them around. draw_x and draw_y are the
+    position to draw at, between the last two steps by store.blend.
+    """
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def x(self):
+        return float(self.store.x[self.index])
+
+    @x.setter
+    def x(self, value):
+        self.store.x[self.index] = value
+
+    @property
+    def y(self):
+        return float(self.store.y[self.index])
+
+    @y.setter
+    def y(self, value):
+        self.store.y[self.index] = value
+
+    @property
+    def draw_x(self):
+        store, index = self.store, self.index
+        prev = float(store.prev_x[index])
+        return prev + (float(store.x[index]) - prev) * store.blend
+
+    @property
+    def draw_y(self):
+        store, index = self.store, self.index
+        prev = float(store.prev_y[index])
+        return prev + (float(store.y[index]) - prev) * store.blend
+
+    @property
+    def x_speed(self):
+        return float(self.store.x_speed[self.index])
+
+    @property
+    def speed(self):
+        return float(self.store.speed[self.index])
+
+    @property
+    def flame_timer(self):
+        return float(self.store.flame_timer[self.index])
+
+    @property
+    def width(self):
+        return self.store.width
+
+    @property
+    def height(self):
+        return self.store.height
+
+    @property
+    def destroyed(self):
+        return not self.store.alive[self.index]
+
+    @destroyed.setter
+    def destroyed(self, value):
+        self.store.alive[self.index] = not value
+
+    @property
+    def rect(self):
+        return pygame.Rect(_round_half_away(float(self.store.x[self.index])),
+                           _round_half_away(float(self.store.y[self.index])),
+                           self.store.width, self.store.height)
+
+
+class MissileStore:
+    """Structure-of-arrays storage for every missile in flight.
+
+    x, y, x_speed, speed and flame_timer are contiguous float32 arrays and
+    `alive` is the destroyed/alive mask, so moving, bouncing and testing a
+    whole wave is one vectorized pass. Killed missiles stay in place until
+    compact(), which keeps the survivors in spawn order. prev_x and prev_y
+    hold the position before the last update(), for drawing in between.
+    Slots are reused, so spawning allocates nothing until the store is
+    full; stats counts those misses and the high-water mark of used slots.
+    """
+
+    FIELDS = ("x", "y", "prev_x", "prev_y", "x_speed", "speed", "flame_timer")
+
+    def __init__(self, view, width, height, capacity=64):
+        self.view = view
+        self.width = width
+        self.height = height
+        self.count = 0
+        # How far between prev and current position views are drawn
+        self.blend = 1.0
+        for name in self.FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float32))
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.stats = PoolStats(capacity)
+
+    @property
+    def capacity(self):
+        return len(self.alive)
+
+    def _grow(self):
+        capacity = self.capacity * 2
+        for name in self.FIELDS:
+            array = np.zeros(capacity, dtype=np.float32)
+            array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self.count] = self.alive[:self.count]
+        self.alive = alive
+        self.stats.capacity = capacity
+
+    def spawn(self, x, y, speed=0.0, x_speed=0.0):
+        if self.count == self.capacity:
+            self.stats.misses += 1
+            self._grow()
+        index = self.count
+        self.x[index] = x
+        self.y[index] = y
+        self.prev_x[index] = x
+        self.prev_y[index] = y
+        self.x_speed[index] = x_speed
+        self.speed[index] = speed
+        self.flame_timer[index] = 0
+        self.alive[index] = True
+        self.count += 1
+        self.stats.acquired()
+        return self.view(self, index)
+
+    def update(self, speed=None, bounce_width=None):
+        """Move every missile one frame.
+
+        speed overrides the per-missile fall speed when given. With
+        bounce_width set, missiles also drift sideways and turn around at
+        the walls.
+        """
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        if speed is None:
+            self.y[:n] += self.speed[:n]
+        else:
+            self.y[:n] += speed
+        if bounce_width is not None:
+            x = self.x[:n]
+            x += self.x_speed[:n]
+            x_speed = self.x_speed[:n]
+            x_speed[(x < 0) | (x > bounce_width - self.width)] *= -1
+        self.flame_timer[:n] += 0.2
+
+    def rect_positions(self):
+        """Integer left/top of every missile rect, as pygame would store them"""
+        n = self.count
+        return round_half_away(self.x[:n]), round_half_away(self.y[:n])
+
+    def below(self, limit):
+        """Mask of live missiles whose top edge is past limit"""
+        n = self.count
+        return self.alive[:n] & (self.y[:n] > limit)
+
+    def colliding(self, rect):
+        """Mask of live missiles whose rect overlaps rect"""
+        left, top = self.rect_positions()
+        return (self.alive[:self.count]
+                & (left < rect.right) & (left + self.width > rect.left)
+                & (top < rect.bottom) & (top + self.height > rect.top))
+
+    def kill(self, mask):
+        self.alive[:self.count][mask] = False
+
+    def compact(self):
+        """Drop destroyed missiles, keeping the rest in spawn order"""
+        n = self.count
+        keep = self.alive[:n]
+        remaining = int(np.count_nonzero(keep))
+        if remaining == n:
+            return
+        for name in self.FIELDS:
+            array = getattr(self, name)
+            array[:remaining] = array[:n][keep]
+        self.alive[:remaining] = True
+        self.alive[remaining:n] = False
+        self.count = remaining
+        self.stats.released(n - remaining)
+
+    def clear(self):
+        self.alive[:self.count] = False
+        self.stats.released(self.count)
+        self.count = 0
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive[:self.count]))
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return self.view(self, index)
+
+    def __iter__(self):
+        for index in np.flatnonzero(self.alive[:self.count]):
+            yield self.view(self, int(index))
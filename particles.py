@@ -0,0 +1,108 @@
+import numpy as np
+import pygame
+
+from pool import PoolStats
+
+
+def bake_circle(radius, color, alpha):
+    sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, (*color, alpha), (radius, radius), radius)
+    return sprite
+
+
+class ParticleEngine:
+    """Every particle of every explosion, kept in preallocated NumPy arrays.
+
+    Emitters hand over whole bursts at once, update() moves and fades all
+    live particles in one vectorized step, and draw() blits circle sprites
+    from the sprite cache, so no surfaces are created while particles fly.
+    Dead slots are reused by the next burst; stats counts the particles that
+    found no free slot and made the arrays grow.
+    """
+
+    def __init__(self, sprite_cache, color=(255, 100, 0), capacity=256):
+        self.sprite_cache = sprite_cache
+        self.color = color
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.dx = np.zeros(capacity, dtype=np.float32)
+        self.dy = np.zeros(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.int16)
+        self.alpha = np.zeros(capacity, dtype=np.int16)
+        self.fade_rate = np.zeros(capacity, dtype=np.int16)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.stats = PoolStats(capacity)
+
+    @property
+    def capacity(self):
+        return len(self.alive)
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name in ("x", "y", "dx", "dy", "size", "alpha", "fade_rate", "alive"):
+            old = getattr(self, name)
+            array = np.zeros(capacity, dtype=old.dtype)
+            array[:len(old)] = old
+            setattr(self, name, array)
+        self.stats.capacity = capacity
+
+    def emit(self, x, y, dx, dy, size, fade_rate, alpha=255):
+        """Start a burst at (x, y); dx, dy and size hold one entry per particle"""
+        count = len(dx)
+        free = np.flatnonzero(~self.alive)
+        if len(free) < count:
+            self.stats.misses += count - len(free)
+            self._grow(self.capacity + count)
+            free = np.flatnonzero(~self.alive)
+        slots = free[:count]
+        self.x[slots] = x
+        self.y[slots] = y
+        self.dx[slots] = dx
+        self.dy[slots] = dy
+        self.size[slots] = size
+        self.alpha[slots] = alpha
+        self.fade_rate[slots] = fade_rate
+        self.alive[slots] = True
+        self.stats.acquired(count)
+        return slots
+
+    def update(self):
+        live = self.alive
+        self.x[live] += self.dx[live]
+        self.y[live] += self.dy[live]
+        self.alpha[live] = np.maximum(0, self.alpha[live] - self.fade_rate[live])
+        self.alive &= self.alpha > 0
+        self.stats.released(self.stats.in_use - int(np.count_nonzero(self.alive)))
+
+    def draw(self, surface, blend=1.0):
+        """Draw every live particle, blend of the way from its last position to the current one"""
+        live = np.flatnonzero(self.alive)
+        if len(live) == 0:
+            return []
+        sizes = self.size[live].tolist()
+        alphas = self.alpha[live].tolist()
+        # Every drawn particle has moved by exactly (dx, dy) in its last update
+        back = 1.0 - blend
+        xs = (self.x[live] - self.dx[live] * back).tolist()
+        ys = (self.y[live] - self.dy[live] * back).tolist()
+        return surface.blits([(self.sprite(size, alpha), (x - size, y - size))
+                              for size, alpha, x, y in zip(sizes, alphas, xs, ys)])
+
+    def sprite(self, size, alpha):
+        return self.sprite_cache.get(("particle", size, alpha, self.color),
+                                     lambda: bake_circle(size, self.color, alpha))
+
+    def bake(self, sizes, fade_rate, alpha=255):
+        """Bake the sprite for every size and alpha a burst emitted with these settings goes through"""
+        for size in sizes:
+            for step_alpha in range(alpha, 0, -fade_rate):
+                self.sprite(size, step_alpha)
+
+    def clear(self):
+        self.alive[:] = False
+        self.stats.released(self.stats.in_use)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
@@ -0,0 +1,65 @@
+class PoolStats:
+    """Counters shared by every pool-like container.
+
+    in_use is how many entries are live right now, high_water the most
+    that were ever live at once, and misses how many acquires found the
+    pool empty and had to allocate.
+    """
+    __slots__ = ("capacity", "in_use", "high_water", "misses")
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.in_use = 0
+        self.high_water = 0
+        self.misses = 0
+
+    def acquired(self, count=1):
+        self.in_use += count
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+
+    def released(self, count=1):
+        self.in_use -= count
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return (f"PoolStats(capacity={self.capacity}, in_use={self.in_use}, "
+                f"high_water={self.high_water}, misses={self.misses})")
+
+
+class ObjectPool:
+    """Fixed-capacity free list of reusable objects of one class.
+
+    The class must set up all of its state in reset(*args); __init__ should
+    just call reset(). acquire() hands out a pooled object reset in place
+    instead of building a new one. When the free list is empty a fresh
+    object is allocated and counted as a miss. release() puts an object back
+    unless the free list is already full, in which case it is left to the
+    garbage collector.
+    """
+
+    def __init__(self, cls, capacity):
+        self.cls = cls
+        self.free = [cls.__new__(cls) for _ in range(capacity)]
+        self.stats = PoolStats(capacity)
+
+    def acquire(self, *args, **kwargs):
+        if self.free:
+            obj = self.free.pop()
+        else:
+            obj = self.cls.__new__(self.cls)
+            self.stats.misses += 1
+        obj.reset(*args, **kwargs)
+        self.stats.acquired()
+        return obj
+
+    def release(self, obj):
+        self.stats.released()
+        if len(self.free) < self.stats.capacity:
+            self.free.append(obj)
+
+    def release_all(self, objs):
+        for obj in objs:
+            self.release(obj)
@@ -0,0 +1,140 @@
+import time
+
+import numpy as np
+import pygame
+
+from fonts import get_font
+
+
+class SurfaceTally:
+    """Running count of surfaces made outside the sprite and text caches.
+
+    Wrap a per-frame allocation in it, surface = tally(pygame.Surface(...)),
+    and add tally.created to a profiler's surface_counter.
+    """
+    __slots__ = ("created",)
+
+    def __init__(self):
+        self.created = 0
+
+    def __call__(self, surface):
+        self.created += 1
+        return surface
+
+
+class FrameProfiler:
+    """Splits every frame into named phases and keeps their recent timings.
+
+    The loop calls mark(phase) after each phase; the time since the previous
+    mark is charged to that phase, so the cost is one clock read and a dict
+    update and it can stay on all the time. Phases hit more than once a
+    frame (e.g. several simulation steps) add up. end_frame() files the
+    frame into ring buffers of the last `window` frames, from which the
+    overlay shows average, p95 and max per phase.
+
+    phases fixes the order rows are listed in; phases not listed are added
+    as they are first seen. surface_counter, when given, returns a running
+    total of surfaces created; the overlay shows how many were created in
+    the last frame.
+    """
+
+    def __init__(self, phases=(), window=120, surface_counter=None, refresh=15, clock=time.perf_counter):
+        self.window = window
+        self.surface_counter = surface_counter
+        self.refresh = refresh
+        self.clock = clock
+        self.visible = False
+        self.history = {phase: np.zeros(window) for phase in phases}
+        self.current = {}
+        # Seconds per phase of the last finished frame
+        self.frame_phases = {}
+        self.counts = {}
+        self.frames = 0
+        self.surfaces = 0
+        self.surface_total = surface_counter() if surface_counter else 0
+        self.overlay = None
+        self.last = clock()
+
+    def start(self):
+        """Start timing from now; call right before the game loop so setup isn't charged to the first frame"""
+        self.current = {}
+        self.last = self.clock()
+
+    def mark(self, phase):
+        now = self.clock()
+        self.current[phase] = self.current.get(phase, 0.0) + now - self.last
+        self.last = now
+
+    def end_frame(self, **counts):
+        """Close the frame; counts are entity counts to show, e.g. missiles=12"""
+        slot = self.frames % self.window
+        for phase, seconds in self.current.items():
+            history = self.history.get(phase)
+            if history is None:
+                history = self.history[phase] = np.zeros(self.window)
+            history[slot] = seconds
+        # Phases skipped this frame took no time
+        for phase, history in self.history.items():
+            if phase not in self.current:
+                history[slot] = 0.0
+        self.frame_phases = self.current
+        self.current = {}
+        self.counts = counts
+        self.frames += 1
+
+        if self.surface_counter is not None:
+            total = self.surface_counter()
+            self.surfaces = total - self.surface_total
+            self.surface_total = total
+        self.last = self.clock()
+
+    def stats(self):
+        """(phase, average, p95, max) in milliseconds for every phase, plus the whole frame"""
+        filled = min(self.frames, self.window)
+        if filled == 0:
+            return []
+        rows = []
+        frame = np.zeros(filled)
+        for phase, history in self.history.items():
+            samples = history[:filled] * 1000
+            frame += samples
+            if not samples.any():
+                continue  # Not reached lately, e.g. title screen phases
+            rows.append((phase, samples.mean(), np.percentile(samples, 95), samples.max()))
+        rows.append(("frame", frame.mean(), np.percentile(frame, 95), frame.max()))
+        return rows
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.overlay = None
+
+    def render_overlay(self):
+        font = get_font(20)
+        line_height = font.get_linesize()
+        columns = (0, 150, 215, 280)
+        lines = [("phase (ms)", "avg", "p95", "max")]
+        lines += [(phase, f"{avg:.2f}", f"{p95:.2f}", f"{peak:.2f}")
+                  for phase, avg, p95, peak in self.stats()]
+        footer = [" ".join(f"{name} {count}" for name, count in self.counts.items()),
+                  f"surfaces this frame {self.surfaces}"]
+
+        overlay = pygame.Surface((350, line_height * (len(lines) + len(footer)) + 10), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 170))
+        y = 5
+        for line in lines:
+            for x, cell in zip(columns, line):
+                overlay.blit(font.render(cell, True, (255, 255, 255)), (5 + x, y))
+            y += line_height
+        for text in footer:
+            overlay.blit(font.render(text, True, (255, 220, 120)), (5, y))
+            y += line_height
+        return overlay
+
+    def draw(self, surface):
+        """Draw the overlay in the top right corner if it is switched on"""
+        if not self.visible:
+            return None
+        # Only re-rendered every few frames, so reading it costs little
+        if self.overlay is None or self.frames % self.refresh == 0:
+            self.overlay = self.render_overlay()
+        return surface.blit(self.overlay, (surface.get_width() - self.overlay.get_width() - 10, 10))
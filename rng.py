@@ -0,0 +1,33 @@
+import random
+
+
+class RandomStreams:
+    """One seeded random.Random per subsystem, all derived from a single seed.
+
+    Each stream is seeded from (seed, name), so how much randomness one
+    subsystem draws never shifts another: cosmetic effects can't change
+    where the next missile spawns. Streams are created on first use.
+
+        rng = RandomStreams(1234)
+        x = rng.spawn.randint(0, 780)
+    """
+
+    def __init__(self, seed=None):
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        """Start every stream over; a seed of None picks a fresh random one"""
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.streams = {}
+
+    def stream(self, name):
+        rng = self.streams.get(name)
+        if rng is None:
+            # String seeds are hashed with SHA-512, so they are stable across runs
+            rng = self.streams[name] = random.Random(f"{self.seed}/{name}")
+        return rng
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.stream(name)
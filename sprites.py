@@ -0,0 +1,61 @@
+from collections import OrderedDict
+
+import pygame
+
+
+def display_signature():
+    """Return something that changes whenever the display mode changes"""
+    display = pygame.display.get_surface()
+    if display is None:
+        return None
+    return (display.get_size(), display.get_bitsize(), display.get_masks())
+
+
+class SpriteCache:
+    """Keeps pre-rendered sprites so each one is only drawn once.
+
+    Sprites are converted to the display's pixel format, so every entry is
+    dropped as soon as the display mode changes. Without a display (headless
+    runs) the baked SRCALPHA surface is kept as is.
+
+    With a limit, only that many sprites are kept and the least recently
+    used one is dropped to make room for a new one.
+    """
+
+    def __init__(self, limit=None):
+        self.sprites = OrderedDict()
+        self.limit = limit
+        self.signature = None
+        # Running total of sprites baked, for the profiler
+        self.baked = 0
+
+    def get(self, key, bake, alpha=True):
+        signature = display_signature()
+        if signature != self.signature:
+            self.clear()
+            self.signature = signature
+
+        sprites = self.sprites
+        sprite = sprites.get(key)
+        if sprite is None:
+            sprite = bake()
+            self.baked += 1
+            if signature is not None:
+                # Opaque layers blit faster without per-pixel alpha
+                sprite = sprite.convert_alpha() if alpha else sprite.convert()
+            sprites[key] = sprite
+            if self.limit is not None and len(sprites) > self.limit:
+                sprites.popitem(last=False)
+        elif self.limit is not None:
+            sprites.move_to_end(key)
+        return sprite
+
+    def discard(self, key):
+        """Forget one sprite that will not be drawn again"""
+        self.sprites.pop(key, None)
+
+    def clear(self):
+        self.sprites.clear()
+
+    def __len__(self):
+        return len(self.sprites)
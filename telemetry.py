@@ -0,0 +1,128 @@
+import csv
+import json
+import threading
+import time
+
+import numpy as np
+
+
+def phase_column(phase):
+    """Column name for a profiler phase, e.g. "draw planets" -> "ms_draw_planets" """
+    return "ms_" + phase.replace(" ", "_")
+
+
+POOL_FIELDS = ("high_water", "misses")
+
+
+def frame_columns(counts, phases, pools=()):
+    """Columns for a game's per-frame rows: the steps simulated, the game's own
+    counts, every pool's high-water mark and misses so far, whether the frame
+    ran late or dropped backlog, and every phase's time"""
+    return ([("steps", "i4")] + list(counts)
+            + [(f"{pool}_{field}", "i4") for pool in pools for field in POOL_FIELDS]
+            + [("late", "i1"), ("backlog_dropped", "i1")]
+            + [(phase_column(phase), "f8") for phase in phases])
+
+
+def pool_values(pools):
+    """Row values for the pool columns, from a {name: PoolStats} dict"""
+    return {f"{pool}_{field}": getattr(stats, field) for pool, stats in pools.items() for field in POOL_FIELDS}
+
+
+class TelemetryRecorder:
+    """Records one row of numbers per frame and writes them out in the background.
+
+    Rows go into a preallocated NumPy ring buffer. A daemon thread wakes up
+    every flush_interval seconds, or as soon as the buffer is half full,
+    copies out what was recorded since its last visit and appends it to
+    path as JSON lines (.jsonl) or CSV (any other extension), so the game
+    loop doesn't wait on the disk. Only if the writer still falls a whole
+    buffer behind, as in headless runs stepping tens of thousands of frames
+    a second, does record() write the buffer out itself rather than
+    overwrite rows. Rows that go missing anyway are counted in `lost` and
+    reported by close().
+
+    columns are (name, NumPy dtype) pairs; every row also gets the frame
+    index and the wall time since the previous row in milliseconds.
+    """
+
+    def __init__(self, path, columns, capacity=4096, flush_interval=1.0, clock=time.perf_counter):
+        self.path = path
+        self.ring = np.zeros(capacity, dtype=[("frame", "i8"), ("dt_ms", "f8")] + list(columns))
+        self.names = self.ring.dtype.names
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.head = 0
+        self.tail = 0
+        self.lost = 0
+        self.last = clock()
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()  # One flush at a time, from either thread
+        self.wake = threading.Event()
+        self.stop = threading.Event()
+
+        self.file = open(path, "w", newline="")
+        self.jsonl = path.endswith(".jsonl")
+        if not self.jsonl:
+            self.csv = csv.writer(self.file)
+            self.csv.writerow(self.names)
+        self.writer = threading.Thread(target=self.run, name="telemetry-writer", daemon=True)
+        self.writer.start()
+
+    def record(self, phases=None, **values):
+        """Add the row for this frame; phases maps profiler phases to seconds"""
+        now = self.clock()
+        if phases:
+            for phase, seconds in phases.items():
+                values[phase_column(phase)] = seconds * 1000
+        row = (self.head, (now - self.last) * 1000) + tuple(values.get(name, 0) for name in self.names[2:])
+        self.last = now
+        if self.head - self.tail >= self.capacity:
+            # The writer is a whole buffer behind; write out here instead of losing rows
+            self.flush()
+        with self.lock:
+            self.ring[self.head % self.capacity] = row
+            self.head += 1
+            pending = self.head - self.tail
+        if pending >= self.capacity // 2:
+            self.wake.set()
+
+    def take(self):
+        """Copy out the rows recorded since the last call"""
+        with self.lock:
+            head, tail = self.head, self.tail
+            if head - tail > self.capacity:
+                self.lost += head - tail - self.capacity
+                tail = head - self.capacity
+            rows = self.ring[np.arange(tail, head) % self.capacity]
+            self.tail = head
+        return rows
+
+    def flush(self):
+        with self.write_lock:
+            rows = self.take().tolist()
+            if self.jsonl:
+                self.file.writelines(json.dumps(dict(zip(self.names, row))) + "\n" for row in rows)
+            else:
+                self.csv.writerows(rows)
+            self.file.flush()
+
+    def run(self):
+        while not self.stop.is_set():
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            if not self.stop.is_set():
+                self.flush()
+
+    def close(self):
+        """Stop the writer thread, write out whatever is left and report lost rows"""
+        self.stop.set()
+        self.wake.set()
+        self.writer.join()
+        self.flush()
+        self.file.close()
+        if self.lost:
+            print(f"Telemetry: {self.lost} of {self.head} rows were overwritten before they "
+                  f"could be written to {self.path}")
+        return self.lost
@@ -0,0 +1,48 @@
+import time
+
+
+class FixedTimestep:
+    """Runs the simulation at a fixed rate, whatever rate frames are drawn at.
+
+    Each rendered frame, advance() adds the real time that passed to an
+    accumulator and returns how many fixed steps to simulate. At most
+    max_steps are run in one frame; any backlog beyond that is dropped, so
+    a long stall slows the game down instead of freezing it while it catches
+    up. blend is how far the leftover time reaches into the next step, for
+    interpolating positions when drawing.
+    """
+
+    def __init__(self, rate=60, max_steps=5, clock=time.perf_counter):
+        self.step = 1.0 / rate
+        self.max_steps = max_steps
+        self.clock = clock
+        self.reset()
+
+    def reset(self):
+        self.last = self.clock()
+        self.accumulator = 0.0
+        # Whether the last advance() had to drop backlog
+        self.dropped = False
+
+    def advance(self):
+        now = self.clock()
+        self.accumulator += now - self.last
+        self.last = now
+
+        steps = int(self.accumulator / self.step)
+        self.dropped = steps > self.max_steps
+        if self.dropped:
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def blend(self):
+        return min(1.0, self.accumulator / self.step)
+
+
+def lerp(start, end, blend):
+    """Blend between the last two simulated positions for drawing"""
+    return start + (end - start) * blend
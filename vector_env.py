@@ -0,0 +1,230 @@
+"""Run many MissileInvasionEnv games at once across worker processes.
+
+    envs = VectorMissileEnv(num_envs=16, workers=4, seed=1)
+    obs = envs.reset()
+    obs, rewards, dones, infos = envs.step(actions)
+
+Each worker process owns a contiguous slice of the games. Actions,
+observations, rewards and dones live in shared memory, so stepping sends
+each worker a one-byte command and waits for a one-byte reply; nothing is
+pickled per step. The arrays returned by reset() and step() are views of
+that shared memory and are overwritten by the next call; copy them to keep
+them.
+
+Games that end are reset straight away by their worker: that step's
+observation is the new game's first one, while its reward, done flag and
+infos["episode_scores"] / infos["episode_steps"] describe the game that
+just ended.
+
+    python vector_env.py [--envs N] [--workers N] [--steps N]
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from missile_env import MissileInvasionEnv
+
+STEP = b"s"
+RESET = b"r"
+CLOSE = b"c"
+DONE = b"d"
+
+
+def episode_seeds(seed, index):
+    """Endless per-game seeds; game `index` draws its own, independent of the others"""
+    rng = np.random.default_rng([seed, index])
+    while True:
+        yield int(rng.integers(2 ** 63))
+
+
+class SharedArrays:
+    """NumPy arrays laid out back to back in one shared memory block"""
+
+    def __init__(self, specs, name=None):
+        self.specs = specs  # (name, dtype, shape) triples
+        size = sum(np.dtype(dtype).itemsize * int(np.prod(shape)) for _, dtype, shape in specs)
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.arrays = {}
+        offset = 0
+        for key, dtype, shape in specs:
+            array = np.ndarray(shape, dtype=dtype, buffer=self.memory.buf, offset=offset)
+            self.arrays[key] = array
+            offset += array.nbytes
+
+    def close(self):
+        self.arrays = {}
+        self.memory.close()
+
+
+def worker(conn, memory_name, specs, start, stop, seed, env_kwargs):
+    shared = SharedArrays(specs, memory_name)
+    arrays = shared.arrays
+    actions, observations = arrays["actions"], arrays["observations"]
+    rewards, dones = arrays["rewards"], arrays["dones"]
+    scores, levels = arrays["scores"], arrays["levels"]
+    episode_scores, episode_steps = arrays["episode_scores"], arrays["episode_steps"]
+
+    envs = [MissileInvasionEnv(**env_kwargs) for _ in range(start, stop)]
+    seeds = [episode_seeds(seed, index) for index in range(start, stop)]
+    slots = list(zip(range(start, stop), envs, seeds))
+    try:
+        while True:
+            command = conn.recv_bytes()
+            if command == STEP:
+                for index, env, seeds_left in slots:
+                    obs, reward, done, info = env.step(int(actions[index]))
+                    rewards[index] = reward
+                    dones[index] = done
+                    if done:
+                        episode_scores[index] = info["score"]
+                        episode_steps[index] = info["steps"]
+                        obs = env.reset(next(seeds_left))
+                    observations[index] = obs
+                    scores[index] = env.game.score
+                    levels[index] = env.game.level
+            elif command == RESET:
+                for index, env, seeds_left in slots:
+                    observations[index] = env.reset(next(seeds_left))
+                    scores[index] = 0
+                    levels[index] = env.game.level
+                rewards[start:stop] = 0
+                dones[start:stop] = False
+            elif command == CLOSE:
+                break
+            conn.send_bytes(DONE)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        del arrays, actions, observations, rewards, dones, scores, levels, episode_scores, episode_steps
+        shared.close()
+        conn.close()
+
+
+class VectorMissileEnv:
+    """num_envs independent games stepped together by `workers` processes.
+
+    Game i plays the seeds drawn from episode_seeds(seed, i), so a run is
+    reproducible for a given seed however the games are split between
+    workers. Keyword arguments not listed here go to MissileInvasionEnv.
+    workers defaults to one per CPU, capped at num_envs.
+    """
+
+    def __init__(self, num_envs, workers=None, seed=0, start_method=None, **env_kwargs):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, num_envs))
+        probe = MissileInvasionEnv(**env_kwargs)
+        self.num_envs = num_envs
+        self.action_count = probe.action_count
+        self.observation_shape = probe.observation_shape
+        obs_dtype = np.float32 if probe.obs_mode == "features" else np.uint8
+
+        specs = (
+            ("actions", np.int64, (num_envs,)),
+            ("observations", obs_dtype, (num_envs,) + self.observation_shape),
+            ("rewards", np.float32, (num_envs,)),
+            ("dones", np.bool_, (num_envs,)),
+            ("scores", np.int64, (num_envs,)),
+            ("levels", np.int64, (num_envs,)),
+            ("episode_scores", np.int64, (num_envs,)),
+            ("episode_steps", np.int64, (num_envs,)),
+        )
+        self.shared = SharedArrays(specs)
+        arrays = self.shared.arrays
+        self.actions = arrays["actions"]
+        self.observations = arrays["observations"]
+        self.rewards = arrays["rewards"]
+        self.dones = arrays["dones"]
+        self.infos = {key: arrays[key] for key in ("scores", "levels", "episode_scores", "episode_steps")}
+
+        context = multiprocessing.get_context(start_method)
+        self.conns = []
+        self.processes = []
+        # Split the games as evenly as possible, in order
+        bounds = np.linspace(0, num_envs, workers + 1).astype(int)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=worker, name=f"missile-env-{start}",
+                args=(child, self.shared.memory.name, specs, int(start), int(stop), seed, env_kwargs),
+                daemon=True)
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+        self.closed = False
+
+    def broadcast(self, command):
+        for conn in self.conns:
+            conn.send_bytes(command)
+        for conn in self.conns:
+            conn.recv_bytes()
+
+    def reset(self):
+        """Start a new game everywhere and return the first observations"""
+        self.broadcast(RESET)
+        return self.observations
+
+    def step(self, actions):
+        """Step every game with actions[i] and return (obs, rewards, dones, infos)"""
+        self.actions[:] = actions
+        self.broadcast(STEP)
+        return self.observations, self.rewards, self.dones, self.infos
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for conn in self.conns:
+            try:
+                conn.send_bytes(CLOSE)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self.conns:
+            conn.close()
+        self.actions = self.observations = self.rewards = self.dones = self.infos = None
+        self.shared.close()
+        self.shared.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def benchmark(envs=8, workers=None, steps=2000, seed=0, **env_kwargs):
+    rng = np.random.default_rng(seed)
+    with VectorMissileEnv(envs, workers, seed, **env_kwargs) as vector:
+        vector.reset()
+        games = 0
+        start = time.perf_counter()
+        for _ in range(steps):
+            _, _, dones, _ = vector.step(rng.integers(vector.action_count, size=envs))
+            games += int(dones.sum())
+        elapsed = time.perf_counter() - start
+        workers = len(vector.processes)
+    print(f"{envs} games on {workers} workers: {envs * steps / elapsed:.0f} steps/s, "
+          f"{games} games finished")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure vectorized environment throughput")
+    parser.add_argument("--envs", type=int, default=8, help="games stepped together")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--steps", type=int, default=2000, help="batched steps to time")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--obs-mode", choices=MissileInvasionEnv.OBS_MODES, default="features")
+    args = parser.parse_args()
+    benchmark(args.envs, args.workers, args.steps, args.seed, obs_mode=args.obs_mode)